@@ -0,0 +1,277 @@
+"""Benchmark of BaseObjectList pull/diff/push operations at realistic scale, against the bundled fake GNS3 server
+
+For each topology size and pattern, a synthetic project is generated on a fake GNS3 server, then each operation is
+measured: wall time, CPU time, CPU time spent in metadata diffs and in link ends matching, HTTP calls and bytes
+transferred, and peak memory. Results are written as JSON, and can be compared with the results of a previous run:
+
+    python -m benchmarks.bench_gns3_client --sizes 100 1000 --output results.json
+    python -m benchmarks.bench_gns3_client --sizes 100 1000 --compare results.json
+"""
+import sys
+import json
+import time
+import platform
+import argparse
+import functools
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import logzero
+from gns3_client import Server, Project, Link, BaseObjectMetadata, LinkMetadata
+from gns3_client.fake import FakeGNS3Server, FakeAdapter
+
+FAKE_URL = 'http://gns3.fake/v2'
+TOPOLOGIES = 'mesh', 'leaf-spine'
+MESH_POD_SIZE = 8
+MAX_SPINES = 8
+SVG = '<svg height="50" width="100"><rect fill="#ebecff" fill-opacity="1.0" height="50" width="100" /></svg>'
+
+
+class CountingAdapter(FakeAdapter):
+    """Fake transport adapter counting the requests actually sent, e.g. not answered by the cache"""
+
+    def __init__(self, fake: FakeGNS3Server) -> None:
+        super(CountingAdapter, self).__init__(fake)
+        self.reset()
+
+    def reset(self) -> None:
+        self.calls = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def send(self, request, *args, **kwargs):
+        response = super(CountingAdapter, self).send(request, *args, **kwargs)
+        self.calls += 1
+        self.bytes_sent += len(request.body or b'')
+        self.bytes_received += len(response.content)
+        return response
+
+
+class CpuTimer:
+    """Accumulates the CPU time spent in wrapped functions, not counting nested calls twice"""
+
+    def __init__(self) -> None:
+        self.total = 0.0
+        self._depth = 0
+
+    def wrap(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if self._depth:
+                return func(*args, **kwargs)
+            self._depth += 1
+            start = time.process_time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.total += time.process_time() - start
+                self._depth -= 1
+        return wrapper
+
+
+@contextmanager
+def patched(timers: dict):
+    """Wraps metadata diffs and link ends matching with CPU timers"""
+    originals = BaseObjectMetadata.diff, LinkMetadata.diff, Link.are_link_ends_the_same
+    BaseObjectMetadata.diff = timers['diff'].wrap(BaseObjectMetadata.diff)
+    LinkMetadata.diff = timers['diff'].wrap(LinkMetadata.diff)
+    Link.are_link_ends_the_same = staticmethod(timers['link_matching'].wrap(Link.are_link_ends_the_same))
+    try:
+        yield
+    finally:
+        BaseObjectMetadata.diff, LinkMetadata.diff = originals[:2]
+        Link.are_link_ends_the_same = staticmethod(originals[2])
+
+
+def call(fake: FakeGNS3Server, method: str, url: str, data: dict = None) -> dict:
+    """Sends a request straight to the fake server and returns the JSON response"""
+    status, _, content = fake.handle(method, FAKE_URL + url, json.dumps(data).encode() if data else None)
+    if status >= 300:
+        raise RuntimeError(content.decode())
+    return json.loads(content)
+
+
+def generate_project(fake: FakeGNS3Server, topology: str, size: int) -> dict:
+    """Generates a synthetic project on the fake server and returns its nodes, links and drawings counts"""
+    project_id = call(fake, 'POST', '/projects', {'name': f'bench-{topology}-{size}'})['project_id']
+    ends = list()
+    if topology == 'mesh':
+        for pod in range(0, size, MESH_POD_SIZE):
+            members = range(pod, min(pod + MESH_POD_SIZE, size))
+            nodes = [call(fake, 'POST', f'/projects/{project_id}/nodes', {
+                'name': f'R{n}', 'node_type': 'qemu', 'compute_id': 'local', 'x': n * 10, 'y': pod * 10,
+                'properties': {'adapters': MESH_POD_SIZE - 1}})['node_id'] for n in members]
+            next_adapter = [0] * len(nodes)
+            for i in range(len(nodes)):
+                for j in range(i + 1, len(nodes)):
+                    ends.append(((nodes[i], next_adapter[i]), (nodes[j], next_adapter[j])))
+                    next_adapter[i] += 1
+                    next_adapter[j] += 1
+    else:
+        nb_spines = max(2, min(MAX_SPINES, size // 50))
+        nb_leaves = size - nb_spines
+        spines = [call(fake, 'POST', f'/projects/{project_id}/nodes', {
+            'name': f'spine{n}', 'node_type': 'qemu', 'compute_id': 'local', 'x': n * 100, 'y': 0,
+            'properties': {'adapters': nb_leaves}})['node_id'] for n in range(nb_spines)]
+        for n in range(nb_leaves):
+            leaf = call(fake, 'POST', f'/projects/{project_id}/nodes', {
+                'name': f'leaf{n}', 'node_type': 'qemu', 'compute_id': 'local', 'x': n * 10, 'y': 500,
+                'properties': {'adapters': nb_spines}})['node_id']
+            ends.extend(((leaf, s), (spine, n)) for s, spine in enumerate(spines))
+    for (node1, adapter1), (node2, adapter2) in ends:
+        call(fake, 'POST', f'/projects/{project_id}/links', {'nodes': [
+            {'node_id': node1, 'adapter_number': adapter1, 'port_number': 0},
+            {'node_id': node2, 'adapter_number': adapter2, 'port_number': 0}]})
+    nb_drawings = max(1, size // 10)
+    for n in range(nb_drawings):
+        svg = SVG.replace('<svg ', f'<svg name="area{n}" ')
+        call(fake, 'POST', f'/projects/{project_id}/drawings', {'svg': svg, 'x': n * 100, 'y': -100})
+    return {'project_id': project_id, 'nodes': size, 'links': len(ends), 'drawings': nb_drawings}
+
+
+def operations(project: Project) -> list:
+    """Returns the benchmarked operations as (name, setup, run) tuples"""
+
+    def pull_all():
+        project.nodes.pull()
+        project.links.pull()
+        project.drawings.pull()
+
+    def move_nodes():
+        project.nodes.pull()
+        for node in project.nodes.data[::10]:
+            node.metadata.x += 10
+
+    def scan_nodes():
+        for _ in project.nodes.iter_remote(filter={'status': 'stopped'}):
+            pass
+
+    def suspend_links():
+        pull_all()
+        for link in project.links.data[::10]:
+            link.metadata.suspend = not link.metadata.suspend
+
+    return [
+        ('nodes.pull', None, project.nodes.pull),
+        ('links.pull', project.nodes.pull, project.links.pull),
+        ('drawings.pull', None, project.drawings.pull),
+        ('project.load', None, project.load),
+        ('nodes.iter_remote', None, scan_nodes),
+        ('nodes.diff', project.nodes.pull, project.nodes.diff),
+        ('links.diff', pull_all, project.links.diff),
+        ('drawings.diff', project.drawings.pull, project.drawings.diff),
+        ('nodes.push', move_nodes, project.nodes.push),
+        ('links.push', suspend_links, project.links.push),
+    ]
+
+
+def measure(server: Server, adapter: CountingAdapter, setup, run, memory: bool) -> dict:
+    """Measures one operation, after its setup"""
+    timers = {'diff': CpuTimer(), 'link_matching': CpuTimer()}
+    server.cache.clear()
+    if setup:
+        setup()
+    adapter.reset()
+    with patched(timers):
+        wall_time, cpu_time = time.perf_counter(), time.process_time()
+        run()
+        wall_time, cpu_time = time.perf_counter() - wall_time, time.process_time() - cpu_time
+    result = {
+        'wall_time': round(wall_time, 6),
+        'cpu_time': round(cpu_time, 6),
+        'diff_cpu_time': round(timers['diff'].total, 6),
+        'link_matching_cpu_time': round(timers['link_matching'].total, 6),
+        'http_calls': adapter.calls,
+        'bytes_sent': adapter.bytes_sent,
+        'bytes_received': adapter.bytes_received,
+    }
+    if memory:
+        server.cache.clear()
+        if setup:
+            setup()
+        tracemalloc.start()
+        run()
+        result['peak_memory'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def benchmark(sizes: list, topologies: list, latency: float, payload_size: int, memory: bool) -> list:
+    """Runs the benchmarks and returns one result per topology, size and operation"""
+    results = list()
+    for topology in topologies:
+        for size in sizes:
+            fake = FakeGNS3Server(payload_size=payload_size)
+            counts = generate_project(fake, topology, size)
+            fake.latency = latency
+            adapter = CountingAdapter(fake)
+            server = Server(FAKE_URL)
+            server.mount('http://gns3.fake/', adapter)
+            project = Project(server=server, project_id=counts.pop('project_id'))
+            for name, setup, run in operations(project):
+                result = dict(topology=topology, **counts, operation=name)
+                result.update(measure(server, adapter, setup, run, memory))
+                print(f"{topology:>10} {size:>6} nodes {name:<17} {result['wall_time']:>9.3f}s "
+                      f"{result['http_calls']:>7} calls", file=sys.stderr)
+                results.append(result)
+            server.close()
+    return results
+
+
+def compare(results: list, baseline: dict, threshold: float) -> list:
+    """Returns the regressions of results against a baseline, e.g. metrics worse by more than threshold times"""
+    regressions = list()
+    key = ('topology', 'nodes', 'operation')
+    previous = {tuple(r[k] for k in key): r for r in baseline['results']}
+    for result in results:
+        reference = previous.get(tuple(result[k] for k in key))
+        if not reference:
+            continue
+        for metric in 'wall_time', 'http_calls', 'bytes_sent', 'bytes_received', 'peak_memory':
+            if metric in result and reference.get(metric) and result[metric] > reference[metric] * threshold:
+                regressions.append(dict({k: result[k] for k in key}, metric=metric, baseline=reference[metric],
+                                        value=result[metric]))
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 100],
+                        help='numbers of nodes of the generated projects, e.g. 100 1000 10000')
+    parser.add_argument('--topologies', nargs='+', choices=TOPOLOGIES, default=list(TOPOLOGIES))
+    parser.add_argument('--latency', type=float, default=0.0, help='fake server latency per request, in seconds')
+    parser.add_argument('--payload-size', type=int, default=0, help='bytes of free text added to each node')
+    parser.add_argument('--no-memory', action='store_true', help='skip peak memory measurements')
+    parser.add_argument('--output', help='JSON file to write results to, instead of standard output')
+    parser.add_argument('--compare', help='JSON results file of a previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='ratio above which a metric is reported as a regression')
+    args = parser.parse_args()
+    logzero.loglevel(level=30)
+
+    results = benchmark(args.sizes, args.topologies, args.latency, args.payload_size, not args.no_memory)
+    report = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {'latency': args.latency, 'payload_size': args.payload_size},
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for r in regressions:
+            print(f"Regression: {r['topology']} {r['nodes']} nodes {r['operation']} {r['metric']}: "
+                  f"{r['baseline']} -> {r['value']}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
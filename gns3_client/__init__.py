@@ -1,11 +1,28 @@
+import io
+import os
+import re
+import codecs
+import math
+import gzip
+import json
+import time
+import uuid
+import hashlib
+import requests
 import requests_cache
 from logzero import logger
-from typing import Optional
+from typing import Optional, Callable, Iterable, Iterator
+from threading import Lock, Semaphore, local
+from contextlib import contextmanager, nullcontext
 from dataclasses import dataclass
-from collections import UserList
+from itertools import chain
+from collections import UserList, Counter, deque
+from functools import lru_cache, wraps
 from xml.etree import ElementTree
-from urllib.parse import urlparse
+from urllib.parse import urlparse, quote
 from urllib3 import disable_warnings
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 
 disable_warnings()
 
@@ -25,21 +42,86 @@ class ObjectAlreadyExists(Exception):
     pass
 
 
+class RequestBudgetExceeded(AssertionError):
+    """Raised when more requests than expected have been sent to the GNS3 server"""
+    pass
+
+
+_URL_ID_PATTERN = re.compile(r'/(?:[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}|\d+)(?=/|$)')
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WHITESPACE = re.compile(r'\s*')
+_JSON_DELIMITER = re.compile(r'[\s,\]]')
+_JSON_NUMBER_PART = re.compile(r'[\d.eE+-]*')
+_MEMOIZED_SVG_MAX_LENGTH = 1024
+
+
+class RequestCounter:
+    """Counts requests sent to a GNS3 server, classified by method and URL template, e.g. ('GET', '/projects/{id}')
+
+    Responses served from cache are not counted, as no request has actually been sent.
+    """
+
+    def __init__(self, base_path: str = '') -> None:
+        self.base_path = base_path.rstrip('/')
+        self.calls = Counter()
+        self._lock = Lock()
+
+    @property
+    def total(self) -> int:
+        """Returns the number of requests counted"""
+        return sum(self.calls.values())
+
+    def template(self, url: str) -> str:
+        """Returns the URL template of url, relative to base path and with object identifiers replaced by {id}"""
+        path = urlparse(url).path
+        if self.base_path and path.startswith(self.base_path):
+            path = path[len(self.base_path):]
+        return _URL_ID_PATTERN.sub('/{id}', path)
+
+    def add(self, method: str, url: str) -> None:
+        """Counts a request"""
+        with self._lock:
+            self.calls[(method.upper(), self.template(url))] += 1
+
+    def report(self) -> str:
+        """Returns the requests counted, most frequent first"""
+        return '\n'.join(f'{n:>6} {method} {template}' for (method, template), n in self.calls.most_common())
+
+
 class Server(requests_cache.CachedSession):
     """
     This class specifies how to connect to a GNS3 server: the base URL, the credentials, and if SSL must be checked.
+
+    When partial_updates is disabled, objects updates always send all attributes instead of the changed ones only.
+    Bulk operations send up to max_workers concurrent requests, over as many pooled connections.
+
+    Responses are cached in memory by default, so that each server has a cache of its own. A persistent backend such
+    as 'sqlite' is also cleared whenever objects change, so it must not be shared with other servers: give each server
+    its own cache_name.
     """
 
-    def __init__(self, base_url: str = None, username: str = None, password: str = None, verify: bool = False) -> None:
-        super(Server, self).__init__()
+    def __init__(self, base_url: str = None, username: str = None, password: str = None, verify: bool = False,
+                 partial_updates: bool = True, max_workers: int = 10, backend: str = 'memory',
+                 cache_name: str = 'http_cache') -> None:
+        super(Server, self).__init__(cache_name, backend=backend)
         self.base_url = base_url
         if username:
             self.auth = (username, password)
         self.verify = verify
+        self.partial_updates = partial_updates
+        self.max_workers = max_workers
+        adapter = HTTPAdapter(pool_maxsize=max_workers)
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
         self.headers.update({"Content-Type": "application/json", "Accept": "application/json"})
         self.templates = TemplateList(server=self)
         self.projects = ProjectList(server=self)
-        self.cache.clear()
+        self.computes = ComputeList(server=self)
+        self.images = ImageList(server=self)
+        self._request_counters = list()
+        self._uncached = local()
+        if backend != 'memory':
+            self.clear_cache()
 
     def _prepend_base_url(self, url: str) -> str:
         """Return the URL prepended with a base URL"""
@@ -51,25 +133,222 @@ class Server(requests_cache.CachedSession):
         return o.geturl()
 
     def request(self, method: str, url: str, prepend_base_url: bool = True, *args, **kwargs):
-        """Extends original requests.request with optional URL prepending"""
+        """Extends original requests.request with optional URL prepending
+
+        CachedSession.request is skipped, since it holds a lock of the session for the whole request, which would
+        serialize concurrent requests: responses are still cached by send.
+        """
         if prepend_base_url:
             url = self._prepend_base_url(url)
         logger.debug(f'Request sent: {method} {url}')
-        r = super(Server, self).request(method, url, *args, **kwargs)
+        r = requests.Session.request(self, method, url, *args, **kwargs)
         logger.debug(f'Request status: {r.status_code} {r.reason}')
+        if not getattr(r, 'from_cache', False):
+            for counter in self._request_counters:
+                counter.add(method, url)
         return r
 
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        """Extends original CachedSession.send so that the cache can be bypassed"""
+        if getattr(self._uncached, 'enabled', False):
+            return requests.Session.send(self, request, **kwargs)
+        return super(Server, self).send(request, **kwargs)
+
+    def invalidate(self, url: str) -> None:
+        """Removes the cached responses to url and to the URLs below it, e.g. those of a project and its objects"""
+        prefix = self._prepend_base_url(url).rstrip('/')
+        keys = [
+            key
+            for key, response in self._cached_responses()
+            if response.url == prefix or response.url.startswith((prefix + '/', prefix + '?'))
+        ]
+        self.cache.bulk_delete(keys)
+
+    def _cached_responses(self) -> list:
+        """Returns the cached (key, response) pairs, copied at once from an in-memory cache that other threads may be
+        writing to"""
+        responses = self.cache.responses
+        return list(getattr(responses, 'data', responses).items())
+
+    def clear_cache(self) -> None:
+        """Removes all cached responses, deleting them one by one from a persistent backend rather than dropping its
+        tables, which other threads may be reading"""
+        self.cache.bulk_delete([key for key, _ in self._cached_responses()])
+
+    @contextmanager
+    def uncached(self):
+        """Sends requests of the current thread straight to server within the context, e.g. neither read from nor
+        written to the cache, such as large or streamed bodies"""
+        enabled = getattr(self._uncached, 'enabled', False)
+        self._uncached.enabled = True
+        try:
+            yield self
+        finally:
+            self._uncached.enabled = enabled
+
+    @contextmanager
+    def expect_requests(self, max: int, strict: bool = True):  # noqa
+        """Counts requests sent to server within the context and checks that there are at most max of them
+
+        RequestBudgetExceeded is raised when the budget is exceeded, or a warning is logged if strict is unset. The
+        RequestCounter is yielded, so that requests can also be checked by method and URL template.
+        """
+        counter = RequestCounter(urlparse(self.base_url).path if self.base_url else '')
+        self._request_counters.append(counter)
+        try:
+            yield counter
+        finally:
+            self._request_counters.remove(counter)
+        if counter.total > max:
+            _msg = f'{counter.total} requests sent to server, expected at most {max}:\n{counter.report()}'
+            if strict:
+                raise RequestBudgetExceeded(_msg)
+            logger.warning(_msg)
+
     def version(self) -> dict:
         """Returns GNS3 server version"""
         return self.get(url="/version").json()
 
+    def gather(self, func: Callable, items: Iterable, return_exceptions: bool = False) -> list:
+        """Calls func on each item concurrently and returns the results in the same order
+
+        Exceptions are returned as results if return_exceptions is set, otherwise the first one is raised once all
+        calls are done.
+        """
+        items = list(items)
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            futures = [executor.submit(func, item) for item in items]
+        results = list()
+        for future in futures:
+            exception = future.exception()
+            if exception and not return_exceptions:
+                raise exception
+            results.append(exception or future.result())
+        return results
+
+
+class Fleet(UserList):
+    """Servers on which the same operations are run concurrently, e.g. to deploy a lab on many GNS3 servers
+
+    At most max_workers operations run at once overall, and at most per_server ones on each server.
+    """
+
+    def __init__(self, initlist=None, max_workers: int = 20, per_server: int = 1) -> None:
+        super(Fleet, self).__init__(initlist)
+        self.max_workers = max_workers
+        self.per_server = per_server
+
+    @classmethod
+    def from_urls(cls, urls: Iterable[str], max_workers: int = 20, per_server: int = 1, **kwargs):
+        """Returns a fleet of servers from their base URLs, kwargs being passed to each Server
+
+        Servers with a persistent cache backend are given cache names of their own, suffixed with their index.
+        """
+        backend = kwargs.get('backend', 'memory')
+        cache_name = kwargs.pop('cache_name', 'http_cache')
+        servers = list()
+        for n, url in enumerate(urls):
+            servers.append(Server(url, cache_name=cache_name if backend == 'memory' else f'{cache_name}_{n}', **kwargs))
+        return cls(servers, max_workers=max_workers, per_server=per_server)
+
+    def run(self, func: Callable, items: Iterable = None) -> dict:
+        """Calls func(server) on each server, or func(server, item) for each item if provided, and returns the
+        results and errors by server
+
+        Results are returned as {'results': {server: result}, 'errors': {server: exception}}, only servers whose call
+        succeeded being in results. With items, results of a server are the list of its item results, None for
+        failed ones, and its errors the list of (item, exception) pairs.
+        """
+        servers = list(self.data)
+        if not servers:
+            return {'results': {}, 'errors': {}}
+        semaphores = {server: Semaphore(self.per_server) for server in servers}
+        calls = [(server, None) for server in servers] if items is None else \
+            [(server, item) for item in list(items) for server in servers]
+
+        def call(args):
+            server, item = args
+            with semaphores[server]:
+                return func(server) if items is None else func(server, item)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(calls))) as executor:
+            futures = [executor.submit(call, args) for args in calls]
+
+        results, errors = dict(), dict()
+        for (server, item), future in zip(calls, futures):
+            exception = future.exception()
+            if exception:
+                logger.error(f'Error on server {server.base_url}: {exception!r}')
+            if items is None:
+                if exception:
+                    errors[server] = exception
+                else:
+                    results[server] = future.result()
+            else:
+                results.setdefault(server, list()).append(None if exception else future.result())
+                if exception:
+                    errors.setdefault(server, list()).append((item, exception))
+        return {'results': results, 'errors': errors}
+
+    def close(self) -> None:
+        """Closes all servers"""
+        for server in self.data:
+            server.close()
+
+
+def _copy_state(value):
+    """Returns a copy of value with its nested dicts and lists, sharing other objects such as the nodes of link ends"""
+    if isinstance(value, dict):
+        return {k: _copy_state(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_state(v) for v in value]
+    return value
+
 
 @dataclass
 class BaseObjectMetadata:
     _READONLY_ATTRIBUTES = ()
+    _synced = None
+    _nested = ()
 
     name: Optional[str] = None
 
+    def __setattr__(self, key, value):
+        if key[0] != '_':
+            self.__dict__.setdefault('_dirty', set()).add(key)
+        super(BaseObjectMetadata, self).__setattr__(key, value)
+
+    @property
+    def dirty(self) -> set:
+        """Returns the attributes assigned since last sync with server, and nested dicts or lists changed in place"""
+        result = set(self.__dict__.get('_dirty', set()))
+        if self._synced is not None:
+            attributes = vars(self)
+            result.update(k for k in self._nested if k not in result and self._differs(k, attributes[k]))
+        return result
+
+    def _differs(self, key: str, value) -> bool:
+        """Returns if value of attribute key differs from the last known server state"""
+        return self._synced.get(key) != value
+
+    def mark_synced(self, remote_object: dict = None):
+        """Records the last known server state, e.g. remote_object or the instance itself if not provided
+
+        Attributes that still differ from remote_object are kept as dirty, others are reset. The recorded state is a
+        copy, so that in-place changes of the nested dicts or lists, which are the only attributes changed without
+        being assigned, are noticed.
+        """
+        if remote_object is None:
+            self._dirty = set()
+            remote_object = self.dict(include_ro=True)
+        else:
+            self._dirty = set(self.diff(remote_object))
+        self._synced = _copy_state(remote_object)
+        self._nested = [k for k, v in vars(self).items() if k[0] != '_' and isinstance(v, (dict, list))]
+        return self
+
     def update(self, data_dict: dict):
         """Updates attributes from dict"""
         for k, v in data_dict.items():
@@ -88,6 +367,18 @@ class BaseObjectMetadata:
             if v is not None and k not in exclude_attrs and k[0] != '_'
         }
 
+    def changes(self) -> dict:
+        """Returns a dict from attributes that differ from the last known server state, or from all attributes if never
+        synced
+
+        Attributes are compared with a copy of the server state, so that nested dicts or lists changed in place are
+        returned too.
+        """
+        result = self.dict()
+        if self._synced is None:
+            return result
+        return {k: v for k, v in result.items() if self._differs(k, vars(self)[k])}
+
     @staticmethod
     def _diff_dict(local_object: dict, remote_object: dict) -> dict:
         """Returns a recursive dict diff between local_object and remote_object dicts"""
@@ -110,12 +401,23 @@ class BaseObjectMetadata:
         return result
 
     def diff(self, remote_object: dict) -> dict:
-        """Returns a dict diff between remote_object and instance (local_object)"""
-        local_object = {
-            k: v
-            for k, v in vars(self).items()
-            if v is not None and k[0] != '_'
-        }
+        """Returns a dict diff between remote_object and instance (local_object)
+
+        When remote_object is the last known server state, which a single dict comparison tells, only dirty attributes
+        are compared, so that untouched objects are skipped without diffing them.
+        """
+        if self._synced is not None and remote_object == self._synced:
+            dirty = self.dirty
+            if not dirty:
+                return dict()
+            attributes = vars(self)
+            local_object = {k: attributes[k] for k in dirty}
+        else:
+            local_object = {
+                k: v
+                for k, v in vars(self).items()
+                if v is not None and k[0] != '_'
+            }
         return self._diff_dict(local_object, remote_object)
 
 
@@ -278,6 +580,60 @@ class ProjectMetadata(BaseObjectMetadata):
     zoom: Optional[int] = None
 
 
+@dataclass
+class SnapshotMetadata(BaseObjectMetadata):
+    """Snapshot Metadata
+
+    JSON example:
+    {
+        'created_at': 1634567890,
+        'name': 'baseline',
+        'project_id': '55b54174-0e63-48c8-97c7-bb3a5c18aa4e',
+        'snapshot_id': '0b4a2e4c-6c3a-4f0c-9f0e-2f1c0d9b2a51'
+    }
+    """
+    _READONLY_ATTRIBUTES = 'created_at', 'project_id', 'snapshot_id'
+
+    snapshot_id: Optional[str] = None
+
+    created_at: Optional[int] = None
+    project_id: Optional[str] = None
+
+
+def _memoize_svg(func: Callable) -> Callable:
+    """Memoizes func against its arguments, the first one being a SVG text, unless the text is longer than
+    _MEMOIZED_SVG_MAX_LENGTH, so that large documents, e.g. with embedded images, are not kept alive by the cache"""
+    memoized = lru_cache(maxsize=4096)(func)
+
+    @wraps(func)
+    def wrapper(svg: str, *args):
+        if len(svg) > _MEMOIZED_SVG_MAX_LENGTH:
+            return func(svg, *args)
+        return memoized(svg, *args)
+
+    wrapper.cache_info = memoized.cache_info
+    wrapper.cache_clear = memoized.cache_clear
+    return wrapper
+
+
+@_memoize_svg
+def _split_svg_name(svg: str) -> tuple:
+    """Returns the name attribute of a SVG document and the document without it, memoized against short SVG texts"""
+    xml = ElementTree.fromstring(svg)
+    name = xml.attrib.pop('name', None)
+    if not name:
+        return None, svg
+    return name, ElementTree.tostring(xml, encoding='unicode')
+
+
+@_memoize_svg
+def _join_svg_name(svg: str, name: str) -> str:
+    """Returns the SVG document with the name attribute set, memoized against short SVG texts"""
+    xml = ElementTree.fromstring(svg)
+    xml.attrib['name'] = name
+    return ElementTree.tostring(xml, encoding='unicode')
+
+
 @dataclass
 class DrawingMetadata(BaseObjectMetadata):
     """Drawing Metadata
@@ -310,16 +666,10 @@ class DrawingMetadata(BaseObjectMetadata):
 
     def _import_svg_field(self) -> None:
         if self.svg:
-            xml = ElementTree.fromstring(self.svg)
-            if 'name' in xml.attrib and xml.attrib['name']:
-                self.name = xml.attrib.pop('name')
-                self.svg = ElementTree.tostring(xml, encoding='unicode')
-
-    def _export_svg_field(self) -> None:
-        xml = ElementTree.fromstring(self.svg)
-        if self.name:
-            xml.attrib['name'] = self.name
-            self.svg = ElementTree.tostring(xml, encoding='unicode')
+            name, svg = _split_svg_name(self.svg)
+            if name:
+                self.name = name
+                self.svg = svg
 
     def update(self, data_dict: dict):
         super(DrawingMetadata, self).update(data_dict)
@@ -327,9 +677,16 @@ class DrawingMetadata(BaseObjectMetadata):
         return self
 
     def dict(self, include_ro: bool = False) -> dict:
-        if not include_ro:
-            self._export_svg_field()
-        return super(DrawingMetadata, self).dict(include_ro)
+        result = super(DrawingMetadata, self).dict(include_ro)
+        if not include_ro and self.svg and self.name:
+            result['svg'] = _join_svg_name(self.svg, self.name)
+        return result
+
+    def changes(self) -> dict:
+        result = super(DrawingMetadata, self).changes()
+        if 'svg' not in result and self.svg and self.name and self._differs('name', self.name):
+            result['svg'] = _join_svg_name(self.svg, self.name)
+        return result
 
 
 @dataclass
@@ -462,6 +819,49 @@ class NodeMetadata(BaseObjectMetadata):
     z: Optional[int] = None
 
 
+@dataclass
+class LinkFilters:
+    """Link filters, e.g. impairments applied to the packets going through a link
+
+    GNS3 links can delay packets (delay and jitter in ms), drop them (packet_loss in percent, or one out of every
+    frequency_drop), corrupt them (corrupt in percent) or only let through those matching a BPF expression. Filters
+    set to None are not applied.
+
+    JSON example:
+    {
+        "delay": [100, 10],
+        "packet_loss": [5]
+    }
+    """
+    delay: Optional[int] = None
+    jitter: Optional[int] = None
+    packet_loss: Optional[int] = None
+    corrupt: Optional[int] = None
+    frequency_drop: Optional[int] = None
+    bpf: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, filters: Optional[dict]):
+        """Returns filters from the filters field of a link"""
+        filters = filters or {}
+        delay = list(filters.get('delay') or []) + [None, None]
+        result = cls(delay=delay[0], jitter=delay[1])
+        for k in 'packet_loss', 'corrupt', 'frequency_drop', 'bpf':
+            if filters.get(k):
+                setattr(result, k, filters[k][0])
+        return result
+
+    def dict(self) -> dict:
+        """Returns the filters field of a link"""
+        result = dict()
+        if self.delay is not None or self.jitter is not None:
+            result['delay'] = [self.delay or 0, self.jitter or 0]
+        for k in 'packet_loss', 'corrupt', 'frequency_drop', 'bpf':
+            if getattr(self, k) is not None:
+                result[k] = [getattr(self, k)]
+        return result
+
+
 @dataclass
 class LinkMetadata(BaseObjectMetadata):
     """Link Metadata
@@ -527,31 +927,49 @@ class LinkMetadata(BaseObjectMetadata):
     project_id: Optional[str] = None
     suspend: Optional[bool] = None
 
-    def _import_nodes_field(self) -> None:
+    def _import_nodes_field(self, known_nodes: dict = None) -> None:
         if self.nodes:
             for node in self.nodes:
                 if 'node_id' in node:
-                    n = Node(project=self._project, node_id=node['node_id'])
-                    n.read()
+                    n = (known_nodes or {}).get(node['node_id'])
+                    if n is None:
+                        n = Node(project=self._project, node_id=node['node_id'])
+                        n.read()
                     node['node'] = n
                     del node['node_id']
 
-    def _export_nodes_field(self) -> None:
-        if self.nodes:
-            for node in self.nodes:
-                if 'node' in node:
-                    node['node_id'] = node['node'].id
-                    del node['node']
+    def _export_nodes_field(self) -> Optional[list[dict]]:
+        """Returns link ends with nodes given by id, leaving the nodes of the instance untouched"""
+        if self.nodes is None:
+            return None
+        result = list()
+        for node in self.nodes:
+            node = dict(node)
+            if 'node' in node:
+                node['node_id'] = node.pop('node').id
+            result.append(node)
+        return result
 
     def update(self, data_dict: dict):
+        known_nodes = {
+            n['node'].metadata.node_id: n['node']
+            for n in self.nodes or []
+            if isinstance(n.get('node'), Node) and n['node'].metadata.node_id
+        }
         super(LinkMetadata, self).update(data_dict)
-        self._import_nodes_field()
+        self._import_nodes_field(known_nodes)
         return self
 
     def dict(self, include_ro: bool = False) -> dict:
-        if not include_ro:
-            self._export_nodes_field()
-        return super(LinkMetadata, self).dict(include_ro)
+        result = super(LinkMetadata, self).dict(include_ro)
+        if not include_ro and 'nodes' in result:
+            result['nodes'] = self._export_nodes_field()
+        return result
+
+    def _differs(self, key: str, value) -> bool:
+        if key == 'nodes' and value and self._synced.get(key):
+            return not Link.are_link_ends_the_same(self._synced[key], value)
+        return super(LinkMetadata, self)._differs(key, value)
 
     def diff(self, remote_object: dict) -> dict:
         result = super(LinkMetadata, self).diff(remote_object)
@@ -562,6 +980,52 @@ class LinkMetadata(BaseObjectMetadata):
         return result
 
 
+@dataclass
+class ComputeMetadata(BaseObjectMetadata):
+    """Compute Metadata
+
+    JSON example:
+    {
+        'capabilities': {
+            'cpus': 8,
+            'disk_size': 502468108288,
+            'memory': 16777216000,
+            'node_types': ['cloud', 'ethernet_hub', 'ethernet_switch', 'nat', 'vpcs', 'qemu', 'docker'],
+            'platform': 'linux',
+            'version': '2.2.29'
+        },
+        'compute_id': 'local',
+        'connected': True,
+        'cpu_usage_percent': 12.5,
+        'disk_usage_percent': 48.2,
+        'host': '127.0.0.1',
+        'last_error': None,
+        'memory_usage_percent': 35.1,
+        'name': 'gns3vm',
+        'port': 3080,
+        'protocol': 'http',
+        'user': 'admin'
+    }
+    """
+
+    _READONLY_ATTRIBUTES = 'capabilities', 'connected', 'cpu_usage_percent', 'disk_usage_percent', 'last_error', \
+                           'memory_usage_percent'
+
+    compute_id: Optional[str] = None
+
+    capabilities: Optional[dict] = None
+    connected: Optional[bool] = None
+    cpu_usage_percent: Optional[float] = None
+    disk_usage_percent: Optional[float] = None
+    host: Optional[str] = None
+    last_error: Optional[str] = None
+    memory_usage_percent: Optional[float] = None
+    password: Optional[str] = None
+    port: Optional[int] = None
+    protocol: Optional[str] = None
+    user: Optional[str] = None
+
+
 class BaseObject:
     _MetadataClass = BaseObjectMetadata
 
@@ -638,26 +1102,44 @@ class BaseObject:
     def read(self) -> None:
         """Get the GNS3 object on server and update the instance, e.g. sync from server"""
         endpoint = self._get()
-        self.metadata.update(endpoint)
+        self.metadata.update(endpoint).mark_synced()
 
     def create(self) -> None:
         """Create the GNS3 object on server from the instance, e.g. sync to server"""
         logger.info(f'Creating {self._object_type} {self.metadata.name} ...')
+        self._create()
+        self.server.clear_cache()
+
+    def _create(self) -> None:
+        """Send the instance to create the GNS3 object on server and update the instance from the response"""
         json = self.metadata.dict()
         response = self.server.post(url=self._endpoint_url, json=json)
         self._check_status_code(response)
-        self.metadata.update(response.json())
-        self.server.cache.clear()
+        self.metadata.update(response.json()).mark_synced()
+
+    def update(self, full: bool = False) -> None:
+        """Update the GNS3 object on server from the instance, e.g. sync to server
 
-    def update(self) -> None:
-        """Update the GNS3 object on server from the instance, e.g. sync to server"""
+        Only attributes changed since last sync with server are sent, unless full is set or partial updates are
+        disabled on server.
+        """
         logger.info(f'Updating {self._object_type} {self.metadata.name} ...')
+        if full or not self.server.partial_updates:
+            json = self.metadata.dict()
+        else:
+            json = self.metadata.changes()
+            if not json:
+                logger.debug(f'Nothing to update on {self._object_type} {self.metadata.name}')
+                return
+        self._update(json)
+        self.server.clear_cache()
+
+    def _update(self, json: dict) -> None:
+        """Send json to update the GNS3 object on server and update the instance from the response"""
         url = f"{self._endpoint_url}/{self.id}"
-        json = self.metadata.dict()
         response = self.server.put(url=url, json=json)
         self._check_status_code(response)
-        self.metadata.update(response.json())
-        self.server.cache.clear()
+        self.metadata.update(response.json()).mark_synced()
 
     def delete(self) -> None:
         """Delete the GNS3 object on server and reset the instance"""
@@ -666,7 +1148,7 @@ class BaseObject:
         response = self.server.delete(url=url)
         self._check_status_code(response)
         self.metadata = self._MetadataClass()
-        self.server.cache.clear()
+        self.server.clear_cache()
 
     @property
     def exists(self, objects=None):
@@ -706,25 +1188,380 @@ class Template(BaseObject):
             super(Template, self).create()
 
 
+class Compute(BaseObject):
+    _MetadataClass = ComputeMetadata
+
+    def __init__(self, server: Server = None, **kwargs) -> None:
+        super(Compute, self).__init__(**kwargs)
+        self._server = server
+
+    @property
+    def _endpoint_url(self) -> str:
+        return '/computes'
+
+    @property
+    def server(self):
+        """Returns the GNS3 server used by this object"""
+        return self._server
+
+    @property
+    def cpus(self) -> int:
+        """Returns the number of CPUs of the compute"""
+        return (self.metadata.capabilities or {}).get('cpus') or 1
+
+    @property
+    def memory(self) -> int:
+        """Returns the memory of the compute, in bytes"""
+        return (self.metadata.capabilities or {}).get('memory') or 0
+
+    @property
+    def free_memory(self) -> int:
+        """Returns the memory of the compute not in use at last poll, in bytes"""
+        return int(self.memory * (1 - (self.metadata.memory_usage_percent or 0) / 100))
+
+    def supports(self, node_type: str) -> bool:
+        """Returns if the compute can run nodes of node_type, e.g. qemu, docker, ..."""
+        node_types = (self.metadata.capabilities or {}).get('node_types')
+        return node_types is None or node_type in node_types
+
+
+def _open_file(path_or_fileobj, mode: str):
+    """Opens a file path in binary mode, or returns a context leaving an already opened file object open"""
+    if hasattr(path_or_fileobj, 'read') or hasattr(path_or_fileobj, 'write'):
+        return nullcontext(path_or_fileobj)
+    return open(path_or_fileobj, mode)
+
+
+def _remaining_size(f) -> Optional[int]:
+    """Returns the number of bytes left to read in a file object, or None if it is not seekable"""
+    try:
+        position = f.tell()
+        size = f.seek(0, io.SEEK_END) - position
+        f.seek(position)
+        return size
+    except (AttributeError, OSError):
+        return None
+
+
+def _iter_chunks(f, chunk_size: int, progress: Callable = None, total: int = None, done: int = 0):
+    """Reads a file object in chunks, calling progress with the bytes read so far plus done, and the total size"""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        done += len(chunk)
+        if progress:
+            progress(done, total)
+        yield chunk
+
+
+def _iter_json_array(chunks: Iterable[bytes]):
+    """Yields the items of a JSON array received in chunks, holding at most a chunk and an item in memory
+
+    Items must be separated by single commas. A number, true, false or null item is only decoded once a delimiter
+    follows it, since a chunk may end in the middle of it, e.g. after the dot or the exponent of a number.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    expected = '['  # then 'item or ]' after the bracket, ', or ]' after an item, and 'item' after a comma
+    for chunk in chain(chunks, [None]):
+        final = chunk is None
+        buffer += decoder.decode(chunk or b'', final=final)
+        position = 0
+        while True:
+            position = _JSON_WHITESPACE.match(buffer, position).end()
+            if position == len(buffer):
+                break
+            char = buffer[position]
+            if expected == '[':
+                if char != '[':
+                    raise ValueError('Response is not a JSON array')
+                expected = 'item or ]'
+                position += 1
+                continue
+            if char == ']' and expected != 'item':
+                return
+            if expected == ', or ]':
+                if char != ',':
+                    raise ValueError(f'Response is not a valid JSON array: expected , or ] at {char!r}')
+                expected = 'item'
+                position += 1
+                continue
+            if char in ',]':
+                raise ValueError(f'Response is not a valid JSON array: expected an item at {char!r}')
+            try:
+                item, end = _JSON_DECODER.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break  # the item may go on in the next chunk
+            if not isinstance(item, (dict, list, str)) and not _JSON_DELIMITER.match(buffer, end):
+                if end < len(buffer) and (final or not _JSON_NUMBER_PART.fullmatch(buffer, end)):
+                    raise ValueError(f'Response is not a valid JSON array: unexpected {buffer[end]!r}')
+                if not final:
+                    break  # a number may go on in the next chunk
+            yield item
+            expected = ', or ]'
+            position = end
+        buffer = buffer[position:]
+    raise ValueError('Response is a truncated JSON array')
+
+
+def _open_snapshot(path, mode: str):
+    """Opens a snapshot file as text, gzip compressed if its name ends with .gz"""
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
 class Project(BaseObject):
     _MetadataClass = ProjectMetadata
+    _SNAPSHOT_VERSION = 1
 
     def __init__(self, server: Server = None, **kwargs) -> None:
         super(Project, self).__init__(**kwargs)
         self._server = server
-        self.drawings = DrawingList(project=self)
-        self.nodes = NodeList(project=self)
-        self.links = LinkList(project=self)
+        self._drawings = None
+        self._nodes = None
+        self._links = None
+        self._snapshots = None
+        self._topology = None
 
     @property
     def _endpoint_url(self) -> str:
         return '/projects'
 
+    @property
+    def drawings(self):
+        """Returns the drawings of the project, created on first use so that listed projects stay lightweight"""
+        if self._drawings is None:
+            self._drawings = DrawingList(project=self)
+        return self._drawings
+
+    @drawings.setter
+    def drawings(self, drawings) -> None:
+        self._drawings = drawings
+
+    @property
+    def nodes(self):
+        """Returns the nodes of the project, created on first use so that listed projects stay lightweight"""
+        if self._nodes is None:
+            self._nodes = NodeList(project=self)
+        return self._nodes
+
+    @nodes.setter
+    def nodes(self, nodes) -> None:
+        self._nodes = nodes
+        self._topology = None
+
+    @property
+    def links(self):
+        """Returns the links of the project, created on first use so that listed projects stay lightweight"""
+        if self._links is None:
+            self._links = LinkList(project=self)
+        return self._links
+
+    @links.setter
+    def links(self, links) -> None:
+        self._links = links
+        self._topology = None
+
+    @property
+    def snapshots(self):
+        """Returns the snapshots of the project, created on first use so that listed projects stay lightweight"""
+        if self._snapshots is None:
+            self._snapshots = SnapshotList(project=self)
+        return self._snapshots
+
+    @snapshots.setter
+    def snapshots(self, snapshots) -> None:
+        self._snapshots = snapshots
+
+    @property
+    def topology(self):
+        """Returns the graph index of local nodes and links, built on first use and rebuilt after they are pulled"""
+        if self._topology is None:
+            self._topology = Topology(nodes=self.nodes, links=self.links)
+        return self._topology
+
     @property
     def server(self):
         """Returns the GNS3 server used by this object"""
         return self._server
 
+    def snapshot(self, path, pull: bool = True) -> None:
+        """Writes the project, its nodes, drawings and links to a snapshot file, pulled from server unless pull is unset
+
+        Snapshots are JSON lines files, one object per line, gzip compressed if path ends with .gz. Link ends
+        reference nodes by id.
+        """
+        logger.info(f'Writing snapshot of {self._object_type} {self.metadata.name} to {path} ...')
+        if pull:
+            self.load()
+        with _open_snapshot(path, 'w') as f:
+            def write(object_type: str, data: dict) -> None:
+                f.write(json.dumps({'type': object_type, 'data': data}, separators=(',', ':')) + '\n')
+
+            write('snapshot', {'version': self._SNAPSHOT_VERSION})
+            write('project', self.metadata.dict(include_ro=True))
+            for t in self.nodes:
+                write('node', t.metadata.dict(include_ro=True))
+            for t in self.drawings:
+                write('drawing', t.metadata.dict(include_ro=True))
+            for t in self.links:
+                data = t.metadata.dict(include_ro=True)
+                data['nodes'] = [
+                    {**{k: v for k, v in end.items() if k != 'node'}, 'node_id': end['node'].id}
+                    if 'node' in end else end
+                    for end in data.get('nodes') or []
+                ]
+                write('link', data)
+
+    def read_snapshot(self, path) -> tuple:
+        """Reads nodes, drawings and links of this project from a snapshot file, without any request to server
+
+        The file is read one object at a time, and link ends are bound to the nodes read before them.
+        """
+        nodes, drawings, links = NodeList(project=self), DrawingList(project=self), LinkList(project=self)
+        nodes_by_id = dict()
+        with _open_snapshot(path, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                object_type, data = record['type'], record['data']
+                if object_type == 'snapshot' and data.get('version') != self._SNAPSHOT_VERSION:
+                    raise InvalidParameters(f'Unsupported snapshot version {data.get("version")} in {path}')
+                elif object_type == 'node':
+                    node = Node(project=self, **data)
+                    nodes_by_id[node.metadata.node_id] = node
+                    nodes.append(node)
+                elif object_type == 'drawing':
+                    drawings.append(Drawing(project=self, **data))
+                elif object_type == 'link':
+                    for end in data.get('nodes') or []:
+                        try:
+                            end['node'] = nodes_by_id[end.pop('node_id')]
+                        except KeyError:
+                            _msg = f'Link {data.get("link_id")} has an end on a node missing from snapshot {path}'
+                            raise InvalidParameters(_msg)
+                    links.append(Link(project=self, **data))
+        for t in nodes + drawings + links:
+            t.metadata.mark_synced()
+        return nodes, drawings, links
+
+    def diff_snapshot(self, path) -> dict:
+        """Returns the diffs between a snapshot file (remote_objects) and local nodes, drawings and links, offline"""
+        nodes, drawings, links = self.read_snapshot(path)
+        return {
+            'nodes': self.nodes.diff(remote_objects=nodes),
+            'drawings': self.drawings.diff(remote_objects=drawings),
+            'links': self.links.diff(remote_objects=links)
+        }
+
+    def load(self, parallel: bool = True) -> None:
+        """Pulls nodes, links and drawings of the project at once, e.g. to inspect a whole project
+
+        The project id is resolved once, and the three listings are fetched concurrently unless parallel is unset. Link
+        ends are bound to the nodes of the same load.
+        """
+        logger.info(f'Loading {self._object_type} {self.metadata.name} ...')
+        self.metadata.update({'project_id': self.id})
+        self._load(parallel=parallel)
+
+    def _load(self, nodes_pulled: bool = False, parallel: bool = True) -> None:
+        """Pulls nodes, links and drawings of the project at once, or only links and drawings if nodes_pulled is set"""
+        lists = [self.links, self.drawings] if nodes_pulled else [self.nodes, self.links, self.drawings]
+        if parallel:
+            results = self.server.gather(lambda t: t._get(), lists)
+        else:
+            results = [t._get() for t in lists]
+        if not nodes_pulled:
+            self.nodes.data = [Node(project=self, **t) for t in results.pop(0)]
+        links, drawings = results
+        self.links.data = self.links._bind(links, self.nodes.data)
+        self.drawings.data = [Drawing(project=self, **t) for t in drawings]
+        for t in lists:
+            for s in t:
+                s.metadata.mark_synced()
+        self._topology = None
+
+    def export_to(self, path_or_fileobj, include_images: bool = False, include_snapshots: bool = False,
+                  reset_mac_addresses: bool = False, chunk_size: int = 1024 * 1024, progress: Callable = None) -> int:
+        """Exports the project as a portable .gns3project archive to a file path or object, and returns its size
+
+        The archive is streamed in chunks of chunk_size bytes, bypassing the cache, and progress is called after each
+        chunk with the bytes written so far and the total size, if known.
+        """
+        logger.info(f'Exporting {self._object_type} {self.metadata.name} ...')
+        url = f'{self._endpoint_url}/{self.id}/export'
+        params = {
+            'include_images': 'yes' if include_images else 'no',
+            'include_snapshots': 'yes' if include_snapshots else 'no',
+            'reset_mac_addresses': 'yes' if reset_mac_addresses else 'no'
+        }
+        with self.server.uncached():
+            response = self.server.get(url=url, params=params, stream=True)
+        with response:
+            self._check_status_code(response)
+            total = int(response.headers['Content-Length']) if 'Content-Length' in response.headers else None
+            done = 0
+            with _open_file(path_or_fileobj, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+                    done += len(chunk)
+                    if progress:
+                        progress(done, total)
+        return done
+
+    def _open(self) -> None:
+        response = self.server.post(url=f'{self._endpoint_url}/{self.id}/open', json={})
+        self._check_status_code(response)
+        self.metadata.update(response.json()).mark_synced()
+
+    def _close(self) -> None:
+        response = self.server.post(url=f'{self._endpoint_url}/{self.id}/close', json={})
+        self._check_status_code(response)
+        self.metadata.update(response.json() if response.content else {'status': 'closed'}).mark_synced()
+
+    def _duplicate(self, name: str, reset_mac_addresses: bool = False):
+        json = {'name': name, 'reset_mac_addresses': reset_mac_addresses}
+        response = self.server.post(url=f'{self._endpoint_url}/{self.id}/duplicate', json=json)
+        self._check_status_code(response)
+        project = Project(server=self.server, **response.json())
+        project.metadata.mark_synced()
+        return project
+
+    def open(self) -> None:
+        """Open the project on server, e.g. load its nodes on computes"""
+        logger.info(f'Opening {self._object_type} {self.metadata.name} ...')
+        self._open()
+        self.server.clear_cache()
+
+    def close(self) -> None:
+        """Close the project on server, e.g. free the resources of its nodes on computes"""
+        logger.info(f'Closing {self._object_type} {self.metadata.name} ...')
+        self._close()
+        self.server.clear_cache()
+
+    def duplicate(self, name: str, reset_mac_addresses: bool = False):
+        """Duplicate the project on server as a new project with name, and returns it"""
+        logger.info(f'Duplicating {self._object_type} {self.metadata.name} as {name} ...')
+        project = self._duplicate(name, reset_mac_addresses)
+        self.server.clear_cache()
+        return project
+
+    def apply(self, path) -> dict:
+        """Pushes nodes, drawings and links of a snapshot file to server, and returns the diffs applied
+
+        Nodes are pushed first, so that links can be created between nodes created from the snapshot.
+        """
+        logger.info(f'Applying snapshot {path} to {self._object_type} {self.metadata.name} ...')
+        self.nodes, self.drawings, self.links = self.read_snapshot(path)
+        return {
+            'nodes': self.nodes.push(),
+            'drawings': self.drawings.push(),
+            'links': self.links.push()
+        }
+
 
 class Drawing(BaseObject):
     _MetadataClass = DrawingMetadata
@@ -744,8 +1581,44 @@ class Drawing(BaseObject):
         return self.project.server
 
 
+class Snapshot(BaseObject):
+    _MetadataClass = SnapshotMetadata
+
+    def __init__(self, project: Project = None, **kwargs) -> None:
+        super(Snapshot, self).__init__(**kwargs)
+        self.project = project
+
+    @property
+    def _endpoint_url(self) -> str:
+        return f'/projects/{self.project.id}/snapshots'
+
+    @property
+    def server(self):
+        """Returns the GNS3 server used by this object"""
+        return self.project.server
+
+    def restore(self, wait: bool = True, status=None, timeout: float = 60.0, interval: float = 0.5) -> None:
+        """Restore the project from the snapshot on server
+
+        Only the cached responses of the project are invalidated. If wait is set, nodes are polled until they all have
+        one of status, see NodeList.wait, then the project links and drawings are loaded, bound to the nodes of the
+        last poll.
+        """
+        logger.info(f'Restoring {self._object_type} {self.metadata.name} ...')
+        project = self.project
+        response = self.server.post(url=f"{self._endpoint_url}/{self.id}/restore", json={})
+        self._check_status_code(response)
+        project.metadata.update(response.json()).mark_synced()
+        self.server.invalidate(f'/projects/{project.metadata.project_id}')
+        project._topology = None
+        if wait:
+            project.nodes.wait(status, timeout, interval)
+            project._load(nodes_pulled=True)
+
+
 class Node(BaseObject):
     _MetadataClass = NodeMetadata
+    _TEMPLATE_ATTRIBUTES = 'name', 'compute_id', 'x', 'y'
 
     def __init__(self, project: Project = None, template: Template = None, **kwargs) -> None:
         super(Node, self).__init__(**kwargs)
@@ -761,22 +1634,46 @@ class Node(BaseObject):
         """Returns the GNS3 server used by this object"""
         return self.project.server
 
-    def create(self) -> None:
-        """Create the GNS3 object on server from the instance, e.g. sync to server"""
-        logger.info(f'Creating {self._object_type} {self.metadata.name} ...')
+    def create(self, placement: str = None) -> None:
+        """Create the GNS3 object on server from the instance, e.g. sync to server
+
+        When a placement strategy is given, e.g. round-robin, least-loaded or memory-fit, the node compute_id is
+        chosen from the server computes.
+        """
+        if placement:
+            self.metadata.compute_id = self.server.computes.place(self.template, strategy=placement)[0]
+        super(Node, self).create()
+        if self.project and self.project._topology is not None:
+            self.project._topology.add_node(self)
+
+    def _create(self) -> None:
+        """Send the instance to create the GNS3 object on server and update the instance from the response
+
+        Nodes created from a template only accept a few attributes: the remaining ones are then sent in a single
+        update, and only if the server response differs from the instance.
+        """
+        json = self.metadata.dict()
         if self.template:
             url = f"{self._endpoint_url}/{self.template.id}".replace('/nodes/', '/templates/')
+            payload = {k: v for k, v in json.items() if k in self._TEMPLATE_ATTRIBUTES}
         else:
             url = f"{self._endpoint_url}"
-        json = {k: v for k, v in self.metadata.dict().items() if k in ('name', 'compute_id', 'x', 'y')}
-        response = self.server.post(url=url, json=json)
+            payload = json
+        response = self.server.post(url=url, json=payload)
         self._check_status_code(response)
-        json = self.metadata.dict()
-        self.metadata.update(response.json())
-        self.server.cache.clear()
-        # GNS3 server does not succeed at once, bug ?
-        self.metadata.update(json)
-        self.update()
+        remote_object = response.json()
+        self.metadata.update(remote_object).mark_synced()
+        if self.metadata._diff_dict(json, remote_object):
+            self.metadata.update(json)
+            self._update(self.metadata.changes())
+
+    def delete(self) -> None:
+        """Delete the GNS3 object on server and reset the instance"""
+        topology = self.project._topology if self.project else None
+        node_id = self.id if topology is not None else None
+        super(Node, self).delete()
+        if topology is not None:
+            topology.remove_node(node_id)
 
     def start(self) -> None:
         url = f"{self._endpoint_url}/{self.id}/start"
@@ -817,6 +1714,80 @@ class Link(BaseObject):
         """Returns the GNS3 server used by this object"""
         return self.project.server
 
+    def create(self) -> None:
+        """Create the GNS3 object on server from the instance, e.g. sync to server"""
+        super(Link, self).create()
+        if self.project and self.project._topology is not None:
+            self.project._topology.add_link(self)
+
+    def delete(self) -> None:
+        """Delete the GNS3 object on server and reset the instance"""
+        link_id = self.metadata.link_id
+        super(Link, self).delete()
+        if self.project and self.project._topology is not None:
+            self.project._topology.remove_link(link_id or self)
+
+    @property
+    def filters(self) -> LinkFilters:
+        """Returns the filters of the link, as last synced with server"""
+        return LinkFilters.from_dict(self.metadata.filters)
+
+    def set_filters(self, filters) -> None:
+        """Set the filters of the link, from LinkFilters or a filters dict, sending the filters only"""
+        logger.info(f'Setting filters on {self._object_type} {self.id} ...')
+        self._update({'filters': filters.dict() if isinstance(filters, LinkFilters) else dict(filters)})
+        self.server.clear_cache()
+
+    def _start_capture(self, data_link_type: str = 'DLT_EN10MB', capture_file_name: str = None) -> None:
+        json = {'data_link_type': data_link_type}
+        if capture_file_name:
+            json['capture_file_name'] = capture_file_name
+        response = self.server.post(url=f"{self._endpoint_url}/{self.id}/start_capture", json=json)
+        self._check_status_code(response)
+        self.metadata.update(response.json()).mark_synced()
+
+    def _stop_capture(self) -> None:
+        response = self.server.post(url=f"{self._endpoint_url}/{self.id}/stop_capture", json={})
+        self._check_status_code(response)
+        self.metadata.update(response.json()).mark_synced()
+
+    def start_capture(self, data_link_type: str = 'DLT_EN10MB', capture_file_name: str = None) -> None:
+        """Start a packet capture on the link, on the compute of one of its nodes"""
+        logger.info(f'Starting capture on {self._object_type} {self.id} ...')
+        self._start_capture(data_link_type, capture_file_name)
+        self.server.clear_cache()
+
+    def stop_capture(self) -> None:
+        """Stop the packet capture on the link, keeping the capture file"""
+        logger.info(f'Stopping capture on {self._object_type} {self.id} ...')
+        self._stop_capture()
+        self.server.clear_cache()
+
+    def capture_stream(self, chunk_size: int = 64 * 1024):
+        """Yields the pcap data of the link capture in chunks of chunk_size bytes, as they are received
+
+        The capture is streamed bypassing the cache, so that it is never held in memory as a whole.
+        """
+        with self.server.uncached():
+            response = self.server.get(url=f"{self._endpoint_url}/{self.id}/pcap", stream=True)
+        with response:
+            self._check_status_code(response)
+            yield from response.iter_content(chunk_size=chunk_size)
+
+    def capture_to(self, path_or_fileobj, chunk_size: int = 64 * 1024, progress: Callable = None) -> int:
+        """Writes the pcap data of the link capture to a file path or object, and returns its size
+
+        progress is called after each chunk with the bytes written so far.
+        """
+        done = 0
+        with _open_file(path_or_fileobj, 'wb') as f:
+            for chunk in self.capture_stream(chunk_size):
+                f.write(chunk)
+                done += len(chunk)
+                if progress:
+                    progress(done)
+        return done
+
     @staticmethod
     def are_link_ends_the_same(v1, v2) -> bool:
         # syntax checks
@@ -903,6 +1874,132 @@ class Link(BaseObject):
         raise InvalidParameters(_msg)
 
 
+class Topology:
+    """Graph index of the nodes and links of a project
+
+    Links are indexed by node, and by port occupied, e.g. (node_id, adapter_number, port_number), so that neighbors,
+    ports and paths are found without scanning links. Nodes are given either as Node instances or as node ids.
+    """
+
+    def __init__(self, nodes: Iterable[Node] = (), links: Iterable[Link] = ()) -> None:
+        self._nodes = dict()
+        self._adjacency = dict()
+        self._ports = dict()
+        self._links = dict()
+        self._link_ids = dict()
+        for t in nodes:
+            self.add_node(t)
+        for t in links:
+            self.add_link(t)
+
+    @staticmethod
+    def _node_id(node) -> str:
+        """Returns the id of a node given as a Node instance or as a node id"""
+        node_id = node.metadata.node_id if isinstance(node, Node) else node
+        if not node_id:
+            raise InvalidParameters('Node must provide a node_id to be found in topology')
+        return node_id
+
+    def add_node(self, node: Node) -> None:
+        """Indexes a node"""
+        node_id = self._node_id(node)
+        self._nodes[node_id] = node
+        self._adjacency.setdefault(node_id, dict())
+
+    def remove_node(self, node) -> None:
+        """Removes a node and its links from index"""
+        node_id = self._node_id(node)
+        for link in list(self._adjacency.get(node_id, {})):
+            self.remove_link(link)
+        self._nodes.pop(node_id, None)
+        self._adjacency.pop(node_id, None)
+
+    def add_link(self, link: Link) -> None:
+        """Indexes a link, its ends must have node ids"""
+        ends = [(n['node'].metadata.node_id if 'node' in n else n.get('node_id'), n['adapter_number'], n['port_number'])
+                for n in link.metadata.nodes or []]
+        if len(ends) != 2 or not all(end[0] for end in ends):
+            raise InvalidParameters('Link must provide 2 ends with a node_id to be indexed in topology')
+        self.remove_link(link)
+        (node1, _, _), (node2, _, _) = ends
+        self._adjacency.setdefault(node1, dict())[link] = node2
+        self._adjacency.setdefault(node2, dict())[link] = node1
+        for end in ends:
+            self._ports[end] = link
+        self._links[link] = link.metadata.link_id, ends
+        if link.metadata.link_id:
+            self._link_ids[link.metadata.link_id] = link
+
+    def remove_link(self, link) -> None:
+        """Removes a link from index, given as a Link instance or as a link id"""
+        if not isinstance(link, Link) or link not in self._links:
+            link = self._link_ids.get(link.metadata.link_id if isinstance(link, Link) else link)
+        if link not in self._links:
+            return
+        link_id, ends = self._links.pop(link)
+        self._link_ids.pop(link_id, None)
+        for end in ends:
+            if self._ports.get(end) is link:
+                del self._ports[end]
+            self._adjacency.get(end[0], {}).pop(link, None)
+
+    def node(self, node_id: str) -> Optional[Node]:
+        """Returns the node with node_id"""
+        return self._nodes.get(node_id)
+
+    def links(self, node) -> list[Link]:
+        """Returns the links of a node"""
+        return list(self._adjacency.get(self._node_id(node), {}))
+
+    def neighbors(self, node) -> list:
+        """Returns the nodes linked to a node, as Node instances when indexed or as node ids otherwise"""
+        neighbors = dict.fromkeys(self._adjacency.get(self._node_id(node), {}).values())
+        return [self._nodes.get(node_id, node_id) for node_id in neighbors]
+
+    def link_at(self, node, adapter_number: int, port_number: int) -> Optional[Link]:
+        """Returns the link connected to a port of a node, if any"""
+        return self._ports.get((self._node_id(node), adapter_number, port_number))
+
+    def peer(self, node, adapter_number: int, port_number: int) -> Optional[dict]:
+        """Returns the other end of the link connected to a port of a node as a dict, if any"""
+        link = self.link_at(node, adapter_number, port_number)
+        if link is None:
+            return None
+        end = (self._node_id(node), adapter_number, port_number)
+        node_id, adapter_number, port_number = next(e for e in self._links[link][1] if e != end)
+        return {'node': self._nodes.get(node_id, node_id), 'adapter_number': adapter_number, 'port_number': port_number}
+
+    def is_free(self, node, adapter_number: int, port_number: int) -> bool:
+        """Returns if a port of a node is not connected"""
+        return self.link_at(node, adapter_number, port_number) is None
+
+    def free_ports(self, node) -> list[dict]:
+        """Returns the ports of a node that are not connected, from its ports metadata"""
+        node_id = self._node_id(node)
+        node = self._nodes.get(node_id, node)
+        ports = node.metadata.ports if isinstance(node, Node) else None
+        return [p for p in ports or [] if (node_id, p['adapter_number'], p['port_number']) not in self._ports]
+
+    def path(self, source, target) -> Optional[list]:
+        """Returns the shortest path of nodes from source to target, as returned by neighbors, or None"""
+        source, target = self._node_id(source), self._node_id(target)
+        previous = {source: None}
+        queue = deque([source])
+        while queue:
+            node_id = queue.popleft()
+            if node_id == target:
+                path = list()
+                while node_id is not None:
+                    path.append(self._nodes.get(node_id, node_id))
+                    node_id = previous[node_id]
+                return path[::-1]
+            for neighbor in self._adjacency.get(node_id, {}).values():
+                if neighbor not in previous:
+                    previous[neighbor] = node_id
+                    queue.append(neighbor)
+        return None
+
+
 class BaseObjectList(UserList):
     _ObjectClass = BaseObject
 
@@ -918,64 +2015,178 @@ class BaseObjectList(UserList):
         """Pull objects from GNS3 server and return them as JSON"""
         return self.server.get(url=self._endpoint_url).json()
 
+    def _build(self, t: dict) -> BaseObject:
+        """Returns an object from its JSON"""
+        return self._ObjectClass(**t)
+
     def _get_remote_objects(self) -> list[BaseObject]:
         """Pull objects from GNS3 server and return them as objects"""
-        return [self._ObjectClass(**t) for t in self._get()]
+        return [self._build(t) for t in self._get()]
+
+    def _iter_remote_json(self, filter=None) -> Iterator[dict]:  # noqa
+        """Yields objects listed by GNS3 server as JSON one at a time, parsing the response as it is received
+
+        The listing is streamed bypassing the cache, and objects not matching filter are skipped.
+        """
+        if filter is None or callable(filter):
+            match = filter
+        else:
+            def match(t):
+                return all(t.get(k) == v for k, v in filter.items())
+        with self.server.uncached():
+            response = self.server.get(url=self._endpoint_url, stream=True)
+        with response:
+            BaseObject._check_status_code(response)
+            for t in _iter_json_array(response.iter_content(chunk_size=64 * 1024)):
+                if match is None or match(t):
+                    yield t
+
+    def iter_remote(self, filter=None) -> Iterator[BaseObject]:  # noqa
+        """Yields objects pulled from GNS3 server one at a time, e.g. to scan them without holding them all in memory
+
+        The listing is parsed as it is received, bypassing the cache. filter is either a callable taking the JSON of
+        an object, or a dict of attribute values such as {'node_type': 'qemu', 'status': 'stopped'}, and is applied
+        before objects are built. Objects are neither added to the list nor kept by it.
+        """
+        for t in self._iter_remote_json(filter):
+            s = self._build(t)
+            s.metadata.mark_synced()
+            yield s
 
     @property
     def server(self):
         """Returns the GNS3 server used by this object"""
         return Server()
 
+    def _resolve_ids(self, objects: list) -> None:
+        """Resolve identifiers of objects that only have a name, with a single request to server"""
+        unresolved = [t for t in objects if not t.metadata.__getattribute__(t.object_id_field_name)]
+        if not unresolved:
+            return
+        remote_objects = [t.metadata.dict(include_ro=True) for t in self._get_remote_objects()]
+        for t in unresolved:
+            s = t.find(remote_objects)
+            t.metadata.update({t.object_id_field_name: s[t.object_id_field_name]})
+
+    def _move_many(self, moves) -> None:
+        """Move objects to (x, y) or (x, y, z) coordinates concurrently, sending coordinates only
+
+        Moves are coalesced per object and those to current coordinates are skipped.
+        """
+        moves = {
+            t: dict(zip(('x', 'y', 'z'), coordinates))
+            for t, coordinates in dict(moves).items()
+        }
+        moves = {
+            t: json
+            for t, json in moves.items()
+            if t.metadata._synced is None or any(t.metadata._synced.get(k) != v for k, v in json.items())
+        }
+        if not moves:
+            return
+        logger.info(f'Moving {len(moves)} objects of {self.__class__.__name__} ...')
+        self._resolve_ids(list(moves))
+
+        def move(t):
+            t.metadata.update(moves[t])
+            t._update(moves[t])
+
+        try:
+            self.server.gather(move, moves)
+        finally:
+            self.server.clear_cache()
+
     def pull(self) -> None:
         """Pull objects from server and update local instances, e.g. sync from GNS3 server"""
         logger.info(f'Pulling {self.__class__.__name__} ...')
         self.data = self._get_remote_objects()
+        for t in self.data:
+            t.metadata.mark_synced()
 
-    def push(self):
-        """Push objects to server from local instances, e.g. sync to GNS3 server"""
+    def push(self) -> dict:
+        """Push objects to server from local instances, e.g. sync to GNS3 server, and returns the diff applied
+
+        Objects to update are first synced with their server state, so that only their changes are sent.
+        """
         logger.info(f'Pushing {self.__class__.__name__} ...')
-        diff = self.diff()
+        remote_objects = self._get_remote_objects_if_any()
+        diff = self.diff(remote_objects)
+        remote_objects_metadatas = self._metadatas(remote_objects)
         for t in diff['delete']:
             t.delete()
         for t in diff['create']:
             t.create()
         for t in diff['update']:
+            t.metadata.mark_synced(remote_objects_metadatas[t.metadata.__getattribute__(t.object_id_field_name)])
             t.update()
         self.pull()
+        return diff
 
-    def diff(self) -> dict:
-        """Returns the diff between GNS3 server (remote_objects) and local instances (local_objects)"""
-        logger.info(f'Diffing {self.__class__.__name__} ...')
-
+    def _get_remote_objects_if_any(self) -> list[BaseObject]:
+        """Pull objects from GNS3 server and return them as objects, or none if their parent does not exist"""
         try:
-            remote_objects: list[BaseObject] = self._get_remote_objects()
+            return self._get_remote_objects()
         except ObjectDoesNotExist:
-            remote_objects = list()
-        remote_objects_ids = set([t.id for t in remote_objects])
-        remote_objects_metadatas = {s.id: s.metadata.dict(include_ro=True) for s in remote_objects}
+            return list()
 
-        local_objects: list[BaseObject] = self.data
-        local_objects_with_ids = list()
-        local_objects_without_ids = list()
+    @staticmethod
+    def _metadatas(objects: list[BaseObject]) -> dict:
+        """Returns the metadatas of objects as dicts, indexed by id"""
+        result = dict()
+        for s in objects:
+            metadata = s.metadata.dict(include_ro=True)
+            result[metadata[s.object_id_field_name]] = metadata
+        return result
 
-        for t in local_objects:
-            try:
-                s = t.find(remote_objects_metadatas.values())
-                t.metadata.update({t.object_id_field_name: s[t.object_id_field_name]})
-                local_objects_with_ids.append(t)
-            except ObjectDoesNotExist:
-                local_objects_without_ids.append(t)
+    def _index(self, remote_objects_metadatas: dict) -> dict:
+        """Returns remote objects metadatas indexed by id and by name, e.g. to match local objects in a single pass"""
+        by_name = dict()
+        for t in remote_objects_metadatas.values():
+            if 'name' in t:
+                by_name.setdefault(t['name'], t)
+        return {'id': remote_objects_metadatas, 'name': by_name}
+
+    def _match(self, t: BaseObject, index: dict) -> Optional[dict]:
+        """Returns the remote object metadata matching local object t from index, by id first, then by name"""
+        object_id = t.metadata.__getattribute__(t.object_id_field_name)
+        if object_id:
+            return index['id'].get(object_id)
+        if t.metadata.name:
+            return index['name'].get(t.metadata.name)
+        _msg: str = f"{t._object_type} metadata must provide either a name or a {t.object_id_field_name}"
+        raise InvalidParameters(_msg)
 
-        local_objects_ids = set([t.id for t in local_objects_with_ids])
+    def diff(self, remote_objects: list[BaseObject] = None) -> dict:
+        """Returns the diff between GNS3 server (remote_objects) and local instances (local_objects)
 
-        delete_ids = remote_objects_ids - local_objects_ids
-        update_ids = remote_objects_ids & local_objects_ids
+        Remote objects are pulled from server unless provided, e.g. loaded from a project snapshot. Identities of all
+        objects are resolved once from remote objects, without any further request to server.
+        """
+        logger.info(f'Diffing {self.__class__.__name__} ...')
 
-        create_list = local_objects_without_ids
-        delete_list = [t for t in remote_objects if t.id in delete_ids]
-        update_list = [t for t in local_objects_with_ids
-                       if t.id in update_ids and t.diff(remote_objects_metadatas[t.id])]
+        if remote_objects is None:
+            remote_objects = self._get_remote_objects_if_any()
+        remote_objects_metadatas = self._metadatas(remote_objects)
+        index = self._index(remote_objects_metadatas)
+
+        create_list = list()
+        matches = list()
+        for t in self.data:
+            s = self._match(t, index)
+            if s is None:
+                create_list.append(t)
+                continue
+            object_id = s[t.object_id_field_name]
+            t.metadata.update({t.object_id_field_name: object_id})
+            matches.append((object_id, t))
+
+        local_objects_ids = set(object_id for object_id, _ in matches)
+        delete_list = [
+            s
+            for s in remote_objects
+            if s.metadata.__getattribute__(s.object_id_field_name) not in local_objects_ids
+        ]
+        update_list = [t for object_id, t in matches if t.metadata.diff(remote_objects_metadatas[object_id])]
 
         return {
             'create': create_list,
@@ -996,9 +2207,9 @@ class TemplateList(BaseObjectList):
     def _endpoint_url(self) -> str:
         return '/templates'
 
-    def diff(self) -> dict:
+    def diff(self, remote_objects: list[Template] = None) -> dict:
         """Returns the diff between GNS3 server (remote_objects) and local instances (local_objects)"""
-        result = super(TemplateList, self).diff()
+        result = super(TemplateList, self).diff(remote_objects)
         for k in result.keys():
             result[k] = [t for t in result[k] if t.metadata.builtin is not True
                          and t.metadata.template_type not in self._IGNORED_TEMPLATE_TYPES]
@@ -1009,9 +2220,94 @@ class TemplateList(BaseObjectList):
         """Returns the GNS3 server used by this object"""
         return self._server
 
-    def _get_remote_objects(self) -> list[Template]:
-        """Pull objects from GNS3 server and return them as objects"""
-        return [self._ObjectClass(server=self._server, **t) for t in self._get()]
+    def _build(self, t: dict) -> Template:
+        """Returns an object from its JSON"""
+        return self._ObjectClass(server=self._server, **t)
+
+
+class ComputeList(BaseObjectList):
+    """Computes of the GNS3 server, e.g. the local compute, the GNS3 VM and remote servers running nodes
+
+    Nodes can be spread over connected computes with one of these placement strategies:
+
+    - round-robin: computes in turn, carrying on from one placement to the next
+    - least-loaded: the compute with the lowest CPU or memory usage, counting nodes already placed
+    - memory-fit: the compute with the most free memory, among those with enough memory for the template ram
+    """
+    _ObjectClass = Compute
+    STRATEGIES = 'round-robin', 'least-loaded', 'memory-fit'
+
+    def __init__(self, server: Server, **kwargs) -> None:
+        super(ComputeList, self).__init__(**kwargs)
+        self._server = server
+        self._next = 0
+
+    @property
+    def _endpoint_url(self) -> str:
+        return '/computes'
+
+    @property
+    def server(self):
+        """Returns the GNS3 server used by this object"""
+        return self._server
+
+    def _build(self, t: dict) -> Compute:
+        """Returns an object from its JSON"""
+        return self._ObjectClass(server=self._server, **t)
+
+    def poll(self) -> None:
+        """Pull computes from server bypassing the HTTP cache, e.g. to refresh their usage"""
+        with self.server.uncached():
+            self.pull()
+
+    def place(self, template: Template = None, count: int = 1, strategy: str = 'round-robin',
+              poll: bool = True) -> list[str]:
+        """Returns the compute_id of each of count nodes to create from template, following a placement strategy
+
+        Computes are polled once, unless poll is disabled and they were already pulled. Only connected computes that
+        support the template type are considered, and the template ram (in MB) and cpus are accounted for each node.
+        """
+        if strategy not in self.STRATEGIES:
+            raise InvalidParameters(f'Placement strategy must be one of {", ".join(self.STRATEGIES)}, not "{strategy}"')
+        if template is not None and not template.metadata.template_type:
+            template.read()
+        if poll or not self.data:
+            self.poll()
+        node_type = template.metadata.template_type if template is not None else None
+        computes = [t for t in self.data if t.metadata.connected and (node_type is None or t.supports(node_type))]
+        if not computes:
+            raise ObjectDoesNotExist(f'Cannot find any connected compute supporting {node_type or "nodes"} on server')
+
+        ram = (template.metadata.ram or 0) * 1024 * 1024 if template is not None else 0
+        cpus = (template.metadata.cpus or 1) if template is not None else 1
+        placed = {t.metadata.compute_id: {'ram': 0, 'cpus': 0} for t in computes}
+
+        def load(t):
+            cpu = (t.metadata.cpu_usage_percent or 0) + placed[t.metadata.compute_id]['cpus'] * 100 / t.cpus
+            memory = (t.metadata.memory_usage_percent or 0)
+            if t.memory:
+                memory += placed[t.metadata.compute_id]['ram'] * 100 / t.memory
+            return max(cpu, memory)
+
+        def free_memory(t):
+            return t.free_memory - placed[t.metadata.compute_id]['ram']
+
+        result = list()
+        for _ in range(count):
+            if strategy == 'round-robin':
+                compute = computes[self._next % len(computes)]
+                self._next += 1
+            elif strategy == 'least-loaded':
+                compute = min(computes, key=load)
+            else:
+                fitting = [t for t in computes if free_memory(t) >= ram]
+                if not fitting:
+                    raise InvalidParameters(f'Not enough memory left on computes for {count} nodes of {ram} bytes')
+                compute = max(fitting, key=free_memory)
+            placed[compute.metadata.compute_id]['ram'] += ram
+            placed[compute.metadata.compute_id]['cpus'] += cpus
+            result.append(compute.metadata.compute_id)
+        return result
 
 
 class ProjectList(BaseObjectList):
@@ -1030,9 +2326,73 @@ class ProjectList(BaseObjectList):
         """Returns the GNS3 server used by this object"""
         return self._server
 
-    def _get_remote_objects(self) -> list[Project]:
-        """Pull objects from GNS3 server and return them as objects"""
-        return [self._ObjectClass(server=self._server, **t) for t in self._get()]
+    def _build(self, t: dict) -> Project:
+        """Returns an object from its JSON"""
+        return self._ObjectClass(server=self._server, **t)
+
+    def import_from(self, path_or_fileobj, name: str, project_id: str = None, chunk_size: int = 1024 * 1024,
+                    progress: Callable = None) -> Project:
+        """Imports a portable .gns3project archive from a file path or object as a new project, and returns it
+
+        The archive is streamed in chunks of chunk_size bytes, bypassing the cache, and progress is called after each
+        chunk with the bytes sent so far and the total size, if known.
+        """
+        logger.info(f'Importing Project {name} ...')
+        project_id = project_id or str(uuid.uuid4())
+        url = f'{self._endpoint_url}/{project_id}/import'
+        with _open_file(path_or_fileobj, 'rb') as f:
+            data = _iter_chunks(f, chunk_size, progress, _remaining_size(f))
+            with self.server.uncached():
+                response = self.server.post(url=url, params={'name': name}, data=data,
+                                            headers={'Content-Type': 'application/octet-stream'})
+        self._ObjectClass._check_status_code(response)
+        project = self._ObjectClass(server=self._server, **response.json())
+        project.metadata.mark_synced()
+        self.append(project)
+        self.server.clear_cache()
+        return project
+
+    def statuses(self) -> dict:
+        """Returns the status of each project by name, e.g. 'opened' or 'closed', from a single listing"""
+        return {t['name']: t.get('status') for t in self._get()}
+
+    def duplicate_many(self, project: Project, names: Iterable[str],
+                       reset_mac_addresses: bool = False) -> list[Project]:
+        """Duplicate a project concurrently as new projects with names, e.g. to serve test runs, and returns them"""
+        names = list(names)
+        logger.info(f'Duplicating Project {project.metadata.name} {len(names)} times ...')
+        project.metadata.update({'project_id': project.id})
+        try:
+            projects = self.server.gather(lambda name: project._duplicate(name, reset_mac_addresses), names)
+        finally:
+            self.server.clear_cache()
+        self.extend(projects)
+        return projects
+
+    def close_idle(self, exclude: Iterable[str] = ()) -> list[Project]:
+        """Close the opened projects whose nodes are all stopped, except those named in exclude, and returns them
+
+        Projects are listed once, then the nodes of opened projects are listed and idle projects closed concurrently.
+        """
+        exclude = set(exclude)
+        opened = [t for t in self._get() if t.get('status') == 'opened' and t['name'] not in exclude]
+
+        def is_idle(t):
+            response = self.server.get(url=f"{self._endpoint_url}/{t['project_id']}/nodes")
+            self._ObjectClass._check_status_code(response)
+            return all(n.get('status') == 'stopped' for n in response.json())
+
+        projects = [
+            self._ObjectClass(server=self._server, **t)
+            for t, idle in zip(opened, self.server.gather(is_idle, opened))
+            if idle
+        ]
+        logger.info(f'Closing {len(projects)} idle projects ...')
+        try:
+            self.server.gather(lambda t: t._close(), projects)
+        finally:
+            self.server.clear_cache()
+        return projects
 
 
 class DrawingList(BaseObjectList):
@@ -1051,9 +2411,34 @@ class DrawingList(BaseObjectList):
         """Returns the GNS3 server used by this object"""
         return self._project.server
 
-    def _get_remote_objects(self) -> list[Drawing]:
-        """Pull objects from GNS3 server and return them as objects"""
-        return [self._ObjectClass(project=self._project, **t) for t in self._get()]
+    def _build(self, t: dict) -> Drawing:
+        """Returns an object from its JSON"""
+        return self._ObjectClass(project=self._project, **t)
+
+    def move_many(self, moves) -> None:
+        """Move drawings at once, from a dict or pairs such as {drawing: (x, y)} or {drawing: (x, y, z)}"""
+        self._move_many(moves)
+
+
+class SnapshotList(BaseObjectList):
+    _ObjectClass = Snapshot
+
+    def __init__(self, project: Project, **kwargs) -> None:
+        super(SnapshotList, self).__init__(**kwargs)
+        self._project = project
+
+    @property
+    def _endpoint_url(self) -> str:
+        return f'/projects/{self._project.id}/snapshots'
+
+    @property
+    def server(self):
+        """Returns the GNS3 server used by this object"""
+        return self._project.server
+
+    def _build(self, t: dict) -> Snapshot:
+        """Returns an object from its JSON"""
+        return self._ObjectClass(project=self._project, **t)
 
 
 class NodeList(BaseObjectList):
@@ -1063,6 +2448,11 @@ class NodeList(BaseObjectList):
         super(NodeList, self).__init__(**kwargs)
         self._project = project
 
+    def pull(self) -> None:
+        """Pull objects from server and update local instances, e.g. sync from GNS3 server"""
+        super(NodeList, self).pull()
+        self._project._topology = None
+
     @property
     def _endpoint_url(self) -> str:
         return f'/projects/{self._project.id}/nodes'
@@ -1072,9 +2462,97 @@ class NodeList(BaseObjectList):
         """Returns the GNS3 server used by this object"""
         return self._project.server
 
-    def _get_remote_objects(self) -> list[Node]:
-        """Pull objects from GNS3 server and return them as objects"""
-        return [self._ObjectClass(project=self._project, **t) for t in self._get()]
+    def _build(self, t: dict) -> Node:
+        """Returns an object from its JSON"""
+        return self._ObjectClass(project=self._project, **t)
+
+    def move_many(self, moves) -> None:
+        """Move nodes at once, from a dict or pairs such as {node: (x, y)} or {node: (x, y, z)}"""
+        self._move_many(moves)
+
+    def wait(self, status=None, timeout: float = 60.0, interval: float = 0.5) -> None:
+        """Polls nodes from server until they all have one of status, e.g. 'started', and pulls them
+
+        Each poll is a single request for the nodes listing, bypassing the cache. When status is None, nodes are only
+        waited for to be listed, e.g. while the project is being opened. TimeoutError is raised after timeout seconds.
+        """
+        logger.info(f'Waiting for {self.__class__.__name__} ...')
+        statuses = {status} if isinstance(status, str) else set(status or ())
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.server.uncached():
+                response = self.server.get(url=self._endpoint_url)
+            if response.ok:
+                nodes = response.json()
+                if not statuses or all(t.get('status') in statuses for t in nodes):
+                    break
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f'Nodes of project {self._project.metadata.name} not ready after {timeout} seconds')
+            time.sleep(interval)
+        self.data = [self._build(t) for t in nodes]
+        for t in self.data:
+            t.metadata.mark_synced()
+        self._project._topology = None
+
+    @staticmethod
+    def _layout(count: int, layout: str, origin: tuple, spacing: int) -> list[tuple]:
+        """Returns count (x, y) positions laid out on a grid or on a circle around origin"""
+        x0, y0 = origin
+        if layout == 'grid':
+            columns = math.ceil(math.sqrt(count))
+            return [(x0 + (n % columns) * spacing, y0 + (n // columns) * spacing) for n in range(count)]
+        if layout == 'circle':
+            radius = max(spacing, spacing * count / (2 * math.pi))
+            return [(round(x0 + radius * math.cos(2 * math.pi * n / count)),
+                     round(y0 + radius * math.sin(2 * math.pi * n / count))) for n in range(count)]
+        raise InvalidParameters(f'Layout must be either grid or circle, not "{layout}"')
+
+    def instantiate(self, template: Template, count: int, layout: str = 'grid', name_format: str = None,
+                    origin: tuple = (0, 0), spacing: int = 100, placement: str = None) -> list[Node]:
+        """Creates count nodes from a template concurrently, laid out on a grid or on a circle, and returns them
+
+        The template is resolved once, and names are computed locally from name_format, or else from the template
+        default_name_format, e.g. '{name}-{0}', skipping names already used in the project. When a placement strategy
+        is given, nodes are spread over the server computes, see ComputeList.place.
+        """
+        logger.info(f'Instantiating {count} nodes from Template {template.metadata.name} ...')
+        if count <= 0:
+            return list()
+        if not template.metadata.template_id or template.metadata.default_name_format is None:
+            template.read()
+        name_format = name_format or template.metadata.default_name_format or '{name}-{0}'
+        if '{0}' not in name_format and '{id}' not in name_format:
+            name_format += '{0}'
+        name_format = name_format.replace('{id}', '{0}')
+        used_names = set(t['name'] for t in self._get())
+        names = list()
+        number = 0
+        while len(names) < count:
+            number += 1
+            name = name_format.format(number, name=template.metadata.name)
+            if name not in used_names:
+                names.append(name)
+
+        nodes = [Node(project=self._project, template=template, name=name, x=x, y=y)
+                 for name, (x, y) in zip(names, self._layout(count, layout, origin, spacing))]
+        if placement:
+            for t, compute_id in zip(nodes, self.server.computes.place(template, count, placement)):
+                t.metadata.compute_id = compute_id
+        try:
+            results = self.server.gather(lambda t: t._create(), nodes, return_exceptions=True)
+        finally:
+            self.server.clear_cache()
+        created = [t for t, result in zip(nodes, results) if not isinstance(result, Exception)]
+        self.extend(created)
+        if self._project._topology is not None:
+            for t in created:
+                self._project._topology.add_node(t)
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            logger.error(f'{len(errors)} nodes out of {count} could not be created from Template '
+                         f'{template.metadata.name}')
+            raise errors[0]
+        return created
 
 
 class LinkList(BaseObjectList):
@@ -1084,6 +2562,11 @@ class LinkList(BaseObjectList):
         super(LinkList, self).__init__(**kwargs)
         self._project = project
 
+    def pull(self) -> None:
+        """Pull objects from server and update local instances, e.g. sync from GNS3 server"""
+        super(LinkList, self).pull()
+        self._project._topology = None
+
     @property
     def _endpoint_url(self) -> str:
         return f'/projects/{self._project.id}/links'
@@ -1093,6 +2576,377 @@ class LinkList(BaseObjectList):
         """Returns the GNS3 server used by this object"""
         return self._project.server
 
-    def _get_remote_objects(self) -> list[Link]:
-        """Pull objects from GNS3 server and return them as objects"""
-        return [self._ObjectClass(project=self._project, **t) for t in self._get()]
+    def _get_remote_objects(self, nodes: list[Node] = None) -> list[Link]:
+        """Pull objects from GNS3 server and return them as objects, with ends bound to nodes pulled once"""
+        links = self._get()
+        if nodes is None:
+            nodes = self._project.nodes._get_remote_objects()
+        return self._bind(links, nodes)
+
+    @staticmethod
+    def _port(node: Node, port) -> tuple:
+        """Returns the (adapter_number, port_number) of a node port, given as such or by name, e.g. 'e0'"""
+        if isinstance(port, list):
+            port = tuple(port)
+        for p in node.metadata.ports or []:
+            if port in (p.get('name'), p.get('short_name')) or port == (p['adapter_number'], p['port_number']):
+                return p['adapter_number'], p['port_number']
+        raise InvalidParameters(f'Node {node.metadata.name} has no port {port}')
+
+    def _resolve_nodes(self, nodes: list) -> dict:
+        """Returns a dict of nodes given as Node instances, names or ids, to Node instances with their ids and ports,
+        or to None if not found
+
+        Nodes are listed once, and only if some of them do not have an id or ports yet.
+        """
+        result = dict()
+        unresolved = list()
+        for t in dict.fromkeys(nodes):
+            if isinstance(t, Node) and t.metadata.node_id and t.metadata.ports:
+                result[t] = t
+            else:
+                unresolved.append(t)
+        if not unresolved:
+            return result
+        remote_nodes = self._project.nodes._get()
+        by_key = {t['name']: t for t in remote_nodes}
+        by_key.update({t['node_id']: t for t in remote_nodes})
+        for t in unresolved:
+            remote_node = by_key.get(t.metadata.node_id or t.metadata.name if isinstance(t, Node) else t)
+            if remote_node is None:
+                result[t] = None
+            elif isinstance(t, Node):
+                t.metadata.update({'node_id': remote_node['node_id'], 'ports': remote_node['ports']})
+                result[t] = t
+            else:
+                result[t] = Node(project=self._project, **remote_node)
+                result[t].metadata.mark_synced()
+        return result
+
+    def _select(self, selector) -> list[Link]:
+        """Returns the links of the list matching selector, e.g. None for all, a callable or links"""
+        if selector is None:
+            return list(self.data)
+        if callable(selector):
+            return [t for t in self.data if selector(t)]
+        return list(selector)
+
+    def _set_filters(self, filters: dict) -> None:
+        """Set the filters of many links concurrently, from a dict such as {link: filters dict}"""
+        if not filters:
+            return
+        logger.info(f'Setting filters on {len(filters)} links ...')
+        try:
+            self.server.gather(lambda t: t._update({'filters': filters[t]}), filters)
+        finally:
+            self.server.clear_cache()
+
+    def apply_filters(self, selector, filters, merge: bool = True) -> dict:
+        """Apply filters to the selected links concurrently, and returns their previous filters to revert them
+
+        selector is None for all links, a callable such as lambda link: ... or links. filters are LinkFilters or a
+        filters dict, merged into the current filters of each link unless merge is disabled. Only the filters field
+        is sent, and only to links whose filters change.
+        """
+        filters = filters.dict() if isinstance(filters, LinkFilters) else dict(filters)
+        previous = dict()
+        changes = dict()
+        for t in self._select(selector):
+            current = t.metadata.filters or {}
+            new = dict(current, **filters) if merge else filters
+            if new != current:
+                previous[t] = dict(current)
+                changes[t] = new
+        self._set_filters(changes)
+        return previous
+
+    def revert_filters(self, previous: dict) -> None:
+        """Set back the filters returned by apply_filters"""
+        self._set_filters({t: v for t, v in previous.items() if (t.metadata.filters or {}) != v})
+
+    def start_captures(self, links: Iterable[Link] = None, data_link_type: str = 'DLT_EN10MB') -> None:
+        """Start packet captures on links concurrently, on all links of the list by default"""
+        links = list(self.data if links is None else links)
+        logger.info(f'Starting captures on {len(links)} links ...')
+        try:
+            self.server.gather(lambda t: t._start_capture(data_link_type), links)
+        finally:
+            self.server.clear_cache()
+
+    def stop_captures(self, links: Iterable[Link] = None) -> None:
+        """Stop packet captures on links concurrently, on all capturing links of the list by default"""
+        links = list([t for t in self.data if t.metadata.capturing] if links is None else links)
+        logger.info(f'Stopping captures on {len(links)} links ...')
+        try:
+            self.server.gather(lambda t: t._stop_capture(), links)
+        finally:
+            self.server.clear_cache()
+
+    def connect_many(self, links: Iterable[tuple]) -> dict:
+        """Creates links concurrently, from (node_a, port_a, node_b, port_b) tuples, and returns the created and failed
+        ones as {'created': [link, ...], 'failed': [(tuple, exception), ...]}
+
+        Nodes are given as Node instances, names or ids, and ports as (adapter_number, port_number) tuples or by name.
+        Ports are checked locally against the nodes ports and the links already known, so that links which cannot be
+        created are reported without any request. Failed links do not roll back created ones.
+        """
+        links = list(links)
+        logger.info(f'Connecting {len(links)} links ...')
+        nodes = self._resolve_nodes([t for spec in links for t in (spec[0], spec[2])])
+        topology = self._project.topology
+        used = set()
+        created, failed, pending = list(), list(), list()
+        for spec in links:
+            try:
+                ends = list()
+                for node, port in ((spec[0], spec[1]), (spec[2], spec[3])):
+                    if nodes[node] is None:
+                        raise ObjectDoesNotExist(f'Cannot find Node {node} on server')
+                    node = nodes[node]
+                    adapter_number, port_number = self._port(node, port)
+                    if (node.metadata.node_id, adapter_number, port_number) in used or \
+                            not topology.is_free(node, adapter_number, port_number):
+                        raise InvalidParameters(f'Port {port} of node {node.metadata.name} is already used')
+                    ends.append({'adapter_number': adapter_number, 'node': node, 'port_number': port_number})
+            except (InvalidParameters, ObjectDoesNotExist) as e:
+                failed.append((spec, e))
+                continue
+            used.update((n['node'].metadata.node_id, n['adapter_number'], n['port_number']) for n in ends)
+            pending.append((spec, Link(project=self._project, nodes=ends)))
+
+        try:
+            results = self.server.gather(lambda t: t[1]._create(), pending, return_exceptions=True)
+        finally:
+            self.server.clear_cache()
+        for (spec, link), result in zip(pending, results):
+            if isinstance(result, Exception):
+                failed.append((spec, result))
+                continue
+            created.append(link)
+            self.append(link)
+            topology.add_link(link)
+        return {'created': created, 'failed': failed}
+
+    def _build(self, t: dict, nodes_by_id: dict = None) -> Link:
+        """Returns a link from its JSON, with ends bound to nodes_by_id instead of read from server one by one"""
+        for end in t.get('nodes') or []:
+            if end.get('node_id') in (nodes_by_id or {}):
+                end['node'] = nodes_by_id[end.pop('node_id')]
+        return self._ObjectClass(project=self._project, **t)
+
+    def _bind(self, links: list[dict], nodes: list[Node]) -> list[Link]:
+        """Returns links from JSON, with ends bound to nodes instead of read from server one by one"""
+        nodes_by_id = {t.metadata.node_id: t for t in nodes}
+        return [self._build(t, nodes_by_id) for t in links]
+
+    def iter_remote(self, filter=None, nodes: list[Node] = None) -> Iterator[Link]:  # noqa
+        """Yields links pulled from GNS3 server one at a time, see BaseObjectList.iter_remote
+
+        Link ends are bound to nodes, pulled once unless provided.
+        """
+        if nodes is None:
+            nodes = self._project.nodes._get_remote_objects()
+        nodes_by_id = {t.metadata.node_id: t for t in nodes}
+        for t in self._iter_remote_json(filter):
+            s = self._build(t, nodes_by_id)
+            s.metadata.mark_synced()
+            yield s
+
+    @staticmethod
+    def _ends_keys(nodes: list) -> tuple:
+        """Returns keys of link ends regardless of their order, by node ids and by node names, None if incomplete"""
+        if not nodes or len(nodes) != 2 or not all(isinstance(n.get('node'), Node) for n in nodes):
+            return None, None
+        keys = list()
+        for field in 'node_id', 'name':
+            ends = [(n['node'].metadata.__getattribute__(field), n.get('adapter_number'), n.get('port_number'))
+                    for n in nodes]
+            keys.append(frozenset(ends) if all(isinstance(end[0], str) for end in ends) else None)
+        return tuple(keys)
+
+    def _index(self, remote_objects_metadatas: dict) -> dict:
+        """Returns remote links metadatas indexed by id and by ends"""
+        index = super(LinkList, self)._index(remote_objects_metadatas)
+        index['ends_id'], index['ends_name'] = dict(), dict()
+        for t in remote_objects_metadatas.values():
+            by_id, by_name = self._ends_keys(t.get('nodes'))
+            if by_id:
+                index['ends_id'].setdefault(by_id, t)
+            if by_name:
+                index['ends_name'].setdefault(by_name, t)
+        return index
+
+    def _match(self, t: Link, index: dict) -> Optional[dict]:
+        """Returns the remote link metadata matching local link t from index, by id first, then by ends
+
+        Ends are looked up by node ids, then by node names, and only matched one remote link at a time when neither
+        are complete, e.g. when one end is given by node name and the other one by node id.
+        """
+        if t.metadata.link_id:
+            return index['id'].get(t.metadata.link_id)
+        if not t.metadata.nodes:
+            _msg: str = f"{t._object_type} metadata must provide either nodes or a {t.object_id_field_name}"
+            raise InvalidParameters(_msg)
+        by_id, by_name = self._ends_keys(t.metadata.nodes)
+        if by_id and by_id in index['ends_id']:
+            return index['ends_id'][by_id]
+        if by_name and by_name in index['ends_name']:
+            return index['ends_name'][by_name]
+        if by_id or by_name:
+            return None
+        try:
+            return t.find(index['id'].values())
+        except ObjectDoesNotExist:
+            return None
+
+
+class ImageList:
+    """Images of the emulators of GNS3 computes, e.g. disk images referenced by Qemu, IOU or Dynamips templates
+
+    Images are listed as dicts such as {'filename': ..., 'path': ..., 'md5sum': ..., 'filesize': ...}.
+    """
+    EMULATORS = 'qemu', 'iou', 'dynamips'
+
+    def __init__(self, server: Server) -> None:
+        self._server = server
+
+    @property
+    def server(self):
+        """Returns the GNS3 server used by this object"""
+        return self._server
+
+    def _endpoint_url(self, emulator: str, compute_id: str) -> str:
+        if emulator not in self.EMULATORS:
+            raise InvalidParameters(f'Emulator must be one of {", ".join(self.EMULATORS)}, not "{emulator}"')
+        return f'/computes/{compute_id}/{emulator}/images'
+
+    def get(self, emulator: str = 'qemu', compute_id: str = 'local') -> list[dict]:
+        """Returns the images of an emulator on a compute"""
+        response = self.server.get(url=self._endpoint_url(emulator, compute_id))
+        BaseObject._check_status_code(response)
+        return response.json()
+
+    def find(self, filename: str, emulator: str = 'qemu', compute_id: str = 'local', images: list = None) -> dict:
+        """Returns the image with filename, from images or listed on compute"""
+        if images is None:
+            images = self.get(emulator, compute_id)
+        try:
+            return next(t for t in images if t['filename'] == filename)
+        except StopIteration:
+            raise ObjectDoesNotExist(f'Cannot find {emulator} image "{filename}" on compute {compute_id}')
+
+    def upload(self, path, emulator: str = 'qemu', compute_id: str = 'local', filename: str = None,
+               checksum: bool = True, resume: bool = True, chunk_size: int = 1024 * 1024, progress: Callable = None,
+               images: list = None) -> dict:
+        """Uploads an image file to a compute unless an identical one is listed there, and returns the image
+
+        An image with the same filename and size is checked against the md5 of the file before uploading. Otherwise,
+        the file is streamed in chunks of chunk_size bytes, bypassing the cache, and its md5 is computed in the same
+        pass if checksum is set. progress is called after each chunk with the bytes sent so far and the file size.
+
+        If resume is set and a smaller image with the same filename is listed, e.g. after an interrupted upload, and its
+        md5 matches the start of the file, only the missing bytes are sent with a Content-Range header. The image is
+        then listed again, and the whole file is sent if the compute did not append the missing bytes.
+        """
+        filename = filename or os.path.basename(path)
+        filesize = os.path.getsize(path)
+        try:
+            remote_image = self.find(filename, emulator, compute_id, images)
+        except ObjectDoesNotExist:
+            remote_image = None
+
+        def file_md5(size: int):
+            result = hashlib.md5()
+            with open(path, 'rb') as f:
+                while size > 0:
+                    chunk = f.read(min(chunk_size, size))
+                    if not chunk:
+                        break
+                    result.update(chunk)
+                    size -= len(chunk)
+            return result
+
+        md5 = None
+        prefix_md5 = None
+        offset = 0
+        remote_size = (remote_image or {}).get('filesize') or 0
+        if remote_image and remote_size == filesize and remote_image.get('md5sum'):
+            md5 = file_md5(filesize)
+            if md5.hexdigest() == remote_image['md5sum']:
+                logger.info(f'Skipping upload of {emulator} image {filename}, already on compute {compute_id}')
+                return remote_image
+        elif resume and remote_image and 0 < remote_size < filesize and remote_image.get('md5sum'):
+            prefix_md5 = file_md5(remote_size)
+            if prefix_md5.hexdigest() == remote_image['md5sum']:
+                offset = remote_size
+
+        if offset:
+            logger.info(f'Resuming upload of {emulator} image {filename} to compute {compute_id} at byte {offset} ...')
+        else:
+            logger.info(f'Uploading {emulator} image {filename} to compute {compute_id} ...')
+        digest = None
+        if checksum and not md5:
+            digest = prefix_md5 if offset else hashlib.md5()
+        md5 = md5 or digest
+
+        def chunks(f):
+            for chunk in _iter_chunks(f, chunk_size, progress, filesize, offset):
+                if digest:
+                    digest.update(chunk)
+                yield chunk
+
+        url = f'{self._endpoint_url(emulator, compute_id)}/{quote(filename)}'
+        headers = {'Content-Type': 'application/octet-stream'}
+        if offset:
+            headers['Content-Range'] = f'bytes {offset}-{filesize - 1}/{filesize}'
+        with open(path, 'rb') as f, self.server.uncached():
+            f.seek(offset)
+            response = self.server.post(url=url, data=chunks(f), headers=headers)
+        self.server.clear_cache()
+        if offset and (not response.ok or self.find(filename, emulator, compute_id).get('filesize') != filesize):
+            logger.info(f'Compute {compute_id} did not resume upload of {emulator} image {filename}')
+            return self.upload(path, emulator, compute_id, filename, checksum=checksum, resume=False,
+                               chunk_size=chunk_size, progress=progress, images=[])
+        BaseObject._check_status_code(response)
+        return {
+            'filename': filename,
+            'path': filename,
+            'md5sum': md5.hexdigest() if md5 else None,
+            'filesize': filesize
+        }
+
+    def upload_many(self, paths: Iterable, emulator: str = 'qemu', compute_id: str = 'local', **kwargs) -> list[dict]:
+        """Uploads image files concurrently, listing images once to skip identical ones, and returns the images"""
+        images = self.get(emulator, compute_id)
+        return self.server.gather(lambda path: self.upload(path, emulator, compute_id, images=images, **kwargs),
+                                  paths)
+
+    def download(self, filename: str, path, emulator: str = 'qemu', compute_id: str = 'local', resume: bool = True,
+                 chunk_size: int = 1024 * 1024, progress: Callable = None) -> int:
+        """Downloads an image of a compute to a file, and returns its size
+
+        The image is streamed in chunks of chunk_size bytes, bypassing the cache. If resume is set and the file already
+        exists, only the missing bytes are requested, e.g. to resume an interrupted download. progress is called after
+        each chunk with the bytes written so far and the total size, if known.
+        """
+        logger.info(f'Downloading {emulator} image {filename} from compute {compute_id} ...')
+        offset = os.path.getsize(path) if resume and os.path.exists(path) else 0
+        headers = {'Range': f'bytes={offset}-'} if offset else {}
+        url = f'{self._endpoint_url(emulator, compute_id)}/{quote(filename)}'
+        with self.server.uncached():
+            response = self.server.get(url=url, headers=headers, stream=True)
+        with response:
+            if offset and response.status_code == 416:
+                return offset
+            BaseObject._check_status_code(response)
+            if response.status_code != 206:
+                offset = 0
+            total = offset + int(response.headers['Content-Length']) if 'Content-Length' in response.headers else None
+            done = offset
+            with open(path, 'ab' if offset else 'wb') as f:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+                    done += len(chunk)
+                    if progress:
+                        progress(done, total)
+        return done
@@ -0,0 +1,219 @@
+"""Telnet consoles of GNS3 nodes, opened with asyncio so that many nodes can be configured at once
+
+Consoles are opened from node metadata, e.g. console_host and console port, and driven with expect-style coroutines:
+
+    async def configure(console, node):
+        await console.expect(r'#\\s*$')
+        return await console.push(['configure terminal', f'hostname {node.metadata.name}', 'end'])
+
+    result = ConsolePool(max_per_host=20).run(project.nodes, configure)
+
+or simply, for lists of lines to send on each node console:
+
+    result = ConsolePool().push_configs({node: lines for node, lines in ...})
+"""
+import re
+import codecs
+import asyncio
+from typing import Callable, Iterable, Union
+from urllib.parse import urlparse
+from logzero import logger
+from gns3_client import Node, InvalidParameters
+
+IAC, DONT, DO, WONT, WILL, SB, SE = 255, 254, 253, 252, 251, 250, 240
+ECHO, SGA = 1, 3
+
+PROMPT = r'[>#$]\s*$'
+
+
+class Console:
+    """Telnet session to a node console, with expect-style send and wait
+
+    Telnet options are negotiated on the fly: the server may echo and suppress go ahead, all other options are refused.
+    """
+
+    def __init__(self, host: str, port: int, timeout: float = 10.0, encoding: str = 'utf-8',
+                 newline: str = '\r\n') -> None:
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.encoding = encoding
+        self.newline = newline
+        self.before = ''
+        self._reader = None
+        self._writer = None
+        self._buffer = ''
+        self._pending = b''
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+
+    def __repr__(self):
+        return f'Console(host={self.host!r}, port={self.port!r})'
+
+    @classmethod
+    def from_node(cls, node: Node, **kwargs):
+        """Returns the console of a node, on the GNS3 server host when the node console listens on any address"""
+        if node.metadata.console_type != 'telnet':
+            raise InvalidParameters(f'Node {node.metadata.name} console type must be telnet, '
+                                    f'not "{node.metadata.console_type}"')
+        if not node.metadata.console:
+            raise InvalidParameters(f'Node {node.metadata.name} metadata must provide a console port')
+        host = node.metadata.console_host
+        if not host or host in ('0.0.0.0', '::'):
+            host = urlparse(node.server.base_url).hostname
+        return cls(host, node.metadata.console, **kwargs)
+
+    async def open(self):
+        """Opens the telnet session"""
+        logger.debug(f'Opening console {self.host}:{self.port} ...')
+        self._reader, self._writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port),
+                                                            self.timeout)
+        return self
+
+    async def close(self) -> None:
+        """Closes the telnet session"""
+        if self._writer is None:
+            return
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        self._reader = self._writer = None
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    def _negotiate(self, data: bytes) -> str:
+        """Answers the telnet commands found in data and returns the remaining text"""
+        data = self._pending + data
+        self._pending = b''
+        text = bytearray()
+        replies = bytearray()
+        i = 0
+        while i < len(data):
+            if data[i] != IAC:
+                text.append(data[i])
+                i += 1
+                continue
+            if i + 1 >= len(data):
+                self._pending = data[i:]
+                break
+            command = data[i + 1]
+            if command == IAC:
+                text.append(IAC)
+                i += 2
+            elif command in (DO, DONT, WILL, WONT):
+                if i + 2 >= len(data):
+                    self._pending = data[i:]
+                    break
+                option = data[i + 2]
+                if command == WILL:
+                    replies += bytes((IAC, DO if option in (ECHO, SGA) else DONT, option))
+                elif command == DO:
+                    replies += bytes((IAC, WILL if option == SGA else WONT, option))
+                i += 3
+            elif command == SB:
+                end = data.find(bytes((IAC, SE)), i)
+                if end < 0:
+                    self._pending = data[i:]
+                    break
+                i = end + 2
+            else:
+                i += 2
+        if replies:
+            self._writer.write(bytes(replies))
+        return self._decoder.decode(bytes(text))
+
+    async def send(self, text: str) -> None:
+        """Sends text as is"""
+        self._writer.write(text.encode(self.encoding).replace(b'\xff', b'\xff\xff'))
+        await self._writer.drain()
+
+    async def sendline(self, line: str = '') -> None:
+        """Sends a line followed by a newline"""
+        await self.send(line + self.newline)
+
+    async def expect(self, pattern: Union[str, re.Pattern], timeout: float = None) -> re.Match:
+        """Waits for pattern in the console output and returns the match
+
+        Output up to the match is consumed and kept in before. Raises asyncio.TimeoutError if pattern is not received
+        within timeout, and EOFError if the console is closed.
+        """
+        if isinstance(pattern, str):
+            pattern = re.compile(pattern)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (self.timeout if timeout is None else timeout)
+        while True:
+            match = pattern.search(self._buffer)
+            if match:
+                self.before = self._buffer[:match.start()]
+                self._buffer = self._buffer[match.end():]
+                return match
+            data = await asyncio.wait_for(self._reader.read(4096), max(0.0, deadline - loop.time()))
+            if not data:
+                raise EOFError(f'Console {self.host}:{self.port} closed while waiting for {pattern.pattern!r}')
+            self._buffer += self._negotiate(data)
+
+    async def push(self, lines: Iterable[str], prompt: Union[str, re.Pattern] = PROMPT, timeout: float = None,
+                   echo: bool = True) -> str:
+        """Sends lines one at a time, waiting for prompt after each one, and returns the console output
+
+        When the console echoes, the prompt is only waited for after the echo of each line, so that prompts received
+        late, e.g. after the first newline sent to wake the console up, are not mistaken for answers.
+        """
+        if isinstance(prompt, re.Pattern):
+            prompt = prompt.pattern
+        await self.sendline()
+        await self.expect(prompt, timeout)
+        output = list()
+        for line in lines:
+            await self.sendline(line)
+            pattern = re.escape(line) + r'(?s:.*?)' + prompt if echo and line else prompt
+            match = await self.expect(pattern, timeout)
+            output.append(self.before + match.group())
+        return ''.join(output)
+
+
+class ConsolePool:
+    """Runs coroutines on the consoles of many nodes concurrently
+
+    At most max_per_host consoles are opened at once on each compute host, so that many nodes can be configured in
+    about the time of the slowest one without flooding a compute.
+    """
+
+    def __init__(self, max_per_host: int = 10, **kwargs) -> None:
+        self.max_per_host = max_per_host
+        self._console_kwargs = kwargs
+
+    async def _run(self, nodes: list[Node], func: Callable) -> list:
+        semaphores = dict()
+
+        async def run(node):
+            console = Console.from_node(node, **self._console_kwargs)
+            semaphore = semaphores.setdefault(console.host, asyncio.Semaphore(self.max_per_host))
+            async with semaphore:
+                async with console:
+                    return await func(console, node)
+
+        return await asyncio.gather(*(run(t) for t in nodes), return_exceptions=True)
+
+    def run(self, nodes: Iterable[Node], func: Callable) -> dict:
+        """Runs coroutine func(console, node) on the console of each node, and returns results and errors by node"""
+        nodes = list(nodes)
+        logger.info(f'Running on {len(nodes)} consoles ...')
+        result = {'results': dict(), 'errors': dict()}
+        for node, r in zip(nodes, asyncio.run(self._run(nodes, func))):
+            if isinstance(r, Exception):
+                logger.error(f'Console of node {node.metadata.name} failed: {r!r}')
+                result['errors'][node] = r
+            else:
+                result['results'][node] = r
+        return result
+
+    def push_configs(self, configs: dict, prompt: Union[str, re.Pattern] = PROMPT, timeout: float = None,
+                     echo: bool = True) -> dict:
+        """Sends lines to the console of each node, from a dict such as {node: lines}, see Console.push"""
+        return self.run(configs, lambda console, node: console.push(configs[node], prompt, timeout, echo))
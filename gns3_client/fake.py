@@ -0,0 +1,1092 @@
+"""In-process fake GNS3 server, e.g. to run tests and benchmarks without a real GNS3 server
+
+The fake keeps its state in memory and implements the subset of the GNS3 REST API used by this library. It can be
+used either as a local HTTP server:
+
+    with FakeHTTPServer() as fake:
+        server = Server(fake.url)
+
+or as a requests transport adapter, without any socket:
+
+    fake = FakeGNS3Server()
+    server = Server('http://gns3.fake/v2')
+    server.mount('http://gns3.fake/', FakeAdapter(fake))
+
+Node consoles can be faked as well, with a local telnet server per console:
+
+    with FakeTelnetServer(prompt='R1#') as console:
+        node.metadata.console_host, node.metadata.console = console.host, console.port
+"""
+import io
+import re
+import copy
+import json
+import time
+import struct
+import uuid
+import hashlib
+import zipfile
+import threading
+import socketserver
+from contextlib import contextmanager
+from typing import Optional
+from urllib.parse import urlsplit, parse_qs, unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from requests.adapters import HTTPAdapter
+from urllib3.response import HTTPResponse
+
+
+class FakeError(Exception):
+    """Raised by the fake server handlers to answer with an HTTP error"""
+
+    def __init__(self, status: int, message: str) -> None:
+        super(FakeError, self).__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ConcurrencyCounter:
+    """Counts the requests or sessions being handled at once, and the peak of them
+
+    A counter can be shared by several fakes, so that concurrency is also counted across them.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.current = 0
+        self.peak = 0
+
+    @contextmanager
+    def track(self):
+        """Counts the request or session handled within the context"""
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self.current -= 1
+
+    def reset(self) -> None:
+        """Resets the peak to the number of requests or sessions currently handled"""
+        with self._lock:
+            self.peak = self.current
+
+
+COMPUTE_NODE_TYPES = ['cloud', 'ethernet_hub', 'ethernet_switch', 'frame_relay_switch', 'atm_switch', 'nat', 'vpcs',
+                      'qemu', 'dynamips', 'iou', 'docker', 'virtualbox', 'vmware', 'traceng']
+
+COMPUTE_WRITABLE_ATTRIBUTES = 'host', 'name', 'password', 'port', 'protocol', 'user'
+
+BUILTIN_TEMPLATES = (
+    {'name': 'Cloud', 'template_type': 'cloud', 'category': 'guest', 'symbol': ':/symbols/cloud.svg'},
+    {'name': 'NAT', 'template_type': 'nat', 'category': 'guest', 'symbol': ':/symbols/cloud.svg'},
+    {'name': 'VPCS', 'template_type': 'vpcs', 'category': 'guest', 'symbol': ':/symbols/vpcs_guest.svg'},
+    {'name': 'Ethernet switch', 'template_type': 'ethernet_switch', 'category': 'switch',
+     'symbol': ':/symbols/ethernet_switch.svg'},
+    {'name': 'Ethernet hub', 'template_type': 'ethernet_hub', 'category': 'switch',
+     'symbol': ':/symbols/hub.svg'},
+    {'name': 'Frame Relay switch', 'template_type': 'frame_relay_switch', 'category': 'switch',
+     'symbol': ':/symbols/frame_relay_switch.svg'},
+    {'name': 'ATM switch', 'template_type': 'atm_switch', 'category': 'switch',
+     'symbol': ':/symbols/atm_switch.svg'},
+)
+
+QEMU_TEMPLATE_DEFAULTS = {
+    'adapter_type': 'e1000',
+    'adapters': 1,
+    'bios_image': '',
+    'boot_priority': 'c',
+    'cdrom_image': '',
+    'console_auto_start': False,
+    'console_type': 'telnet',
+    'cpu_throttling': 0,
+    'cpus': 1,
+    'create_config_disk': False,
+    'custom_adapters': [],
+    'default_name_format': '{name}-{0}',
+    'first_port_name': '',
+    'hda_disk_image': '',
+    'hda_disk_interface': 'none',
+    'hdb_disk_image': '',
+    'hdb_disk_interface': 'none',
+    'hdc_disk_image': '',
+    'hdc_disk_interface': 'none',
+    'hdd_disk_image': '',
+    'hdd_disk_interface': 'none',
+    'initrd': '',
+    'kernel_command_line': '',
+    'kernel_image': '',
+    'legacy_networking': False,
+    'linked_clone': True,
+    'mac_address': '',
+    'on_close': 'power_off',
+    'options': '',
+    'platform': 'i386',
+    'port_name_format': 'Ethernet{0}',
+    'port_segment_size': 0,
+    'process_priority': 'normal',
+    'qemu_path': '',
+    'ram': 256,
+    'replicate_network_connection_state': True,
+    'symbol': ':/symbols/qemu_guest.svg',
+    'usage': ''
+}
+
+QEMU_PROPERTIES = (
+    'adapter_type', 'adapters', 'bios_image', 'boot_priority', 'cdrom_image', 'cpu_throttling', 'cpus',
+    'create_config_disk', 'hda_disk_image', 'hda_disk_interface', 'hdb_disk_image', 'hdb_disk_interface',
+    'hdc_disk_image', 'hdc_disk_interface', 'hdd_disk_image', 'hdd_disk_interface', 'initrd', 'kernel_command_line',
+    'kernel_image', 'legacy_networking', 'linked_clone', 'mac_address', 'on_close', 'options', 'platform',
+    'process_priority', 'qemu_path', 'ram', 'replicate_network_connection_state', 'usage'
+)
+
+PROJECT_DEFAULTS = {
+    'auto_close': True,
+    'auto_open': False,
+    'auto_start': False,
+    'drawing_grid_size': 25,
+    'grid_size': 75,
+    'scene_height': 1000,
+    'scene_width': 2000,
+    'show_grid': False,
+    'show_interface_labels': False,
+    'show_layers': False,
+    'snap_to_grid': False,
+    'supplier': None,
+    'variables': None,
+    'zoom': 100
+}
+
+NODE_WRITABLE_ATTRIBUTES = (
+    'compute_id', 'console_auto_start', 'console_type', 'custom_adapters', 'first_port_name', 'label', 'locked',
+    'name', 'node_type', 'port_name_format', 'port_segment_size', 'properties', 'symbol', 'x', 'y', 'z'
+)
+
+LINK_WRITABLE_ATTRIBUTES = 'filters', 'link_style', 'suspend'
+
+LINK_FILTERS = 'frequency_drop', 'packet_loss', 'delay', 'corrupt', 'bpf'
+
+DRAWING_WRITABLE_ATTRIBUTES = 'locked', 'rotation', 'svg', 'x', 'y', 'z'
+
+ID = r'(?P<{}>[^/]+)'
+
+
+class FakeGNS3Server:
+    """Stateful fake of the GNS3 server REST API
+
+    latency is the time in seconds spent on each request, and payload_size the number of bytes of free text added to
+    each node properties, so that response sizes can be tuned. Link captures hold capture_packets frames. After a
+    snapshot is restored, the project is being opened for restore_time seconds, during which nodes cannot be listed.
+    Requests handled at once are counted by concurrency, a new ConcurrencyCounter unless one is shared.
+    """
+
+    def __init__(self, latency: float = 0.0, payload_size: int = 0, capture_packets: int = 1000,
+                 concurrency: ConcurrencyCounter = None) -> None:
+        self.latency = latency
+        self.concurrency = concurrency or ConcurrencyCounter()
+        self.payload_size = payload_size
+        self.capture_packets = capture_packets
+        self._lock = threading.RLock()
+        self._console_port = 5000
+        self.templates = dict()
+        self.projects = dict()
+        self.nodes = dict()
+        self.links = dict()
+        self.drawings = dict()
+        self._node_names = dict()
+        self._used_ports = dict()
+        self._node_ports = dict()
+        self.images = dict()
+        self.captures = dict()
+        self.snapshots = dict()
+        self.restore_time = 0.0
+        self._snapshot_states = dict()
+        self._opening_until = dict()
+        self.computes = dict()
+        self.add_compute('local', host='127.0.0.1')
+        for template in BUILTIN_TEMPLATES:
+            template_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, template['name']))
+            self.templates[template_id] = dict(template, template_id=template_id, builtin=True, compute_id=None,
+                                               default_name_format='{name}{0}')
+        self._routes = [(method, re.compile('^' + pattern.format(
+            project_id=ID.format('project_id'),
+            template_id=ID.format('template_id'),
+            node_id=ID.format('node_id'),
+            link_id=ID.format('link_id'),
+            drawing_id=ID.format('drawing_id'),
+            snapshot_id=ID.format('snapshot_id'),
+            compute_id=ID.format('compute_id'),
+            emulator='(?P<emulator>qemu|iou|dynamips)',
+            filename='(?P<filename>.+)',
+        ) + '$'), handler) for method, pattern, handler in self._route_table()]
+
+    def _route_table(self) -> list:
+        """Returns the (method, path pattern, handler) routes of the fake server"""
+        return [
+            ('GET', '/version', self._get_version),
+            ('GET', '/templates', self._list_templates),
+            ('POST', '/templates', self._create_template),
+            ('GET', '/templates/{template_id}', self._get_template),
+            ('PUT', '/templates/{template_id}', self._update_template),
+            ('DELETE', '/templates/{template_id}', self._delete_template),
+            ('GET', '/projects', self._list_projects),
+            ('POST', '/projects', self._create_project),
+            ('GET', '/projects/{project_id}', self._get_project),
+            ('PUT', '/projects/{project_id}', self._update_project),
+            ('DELETE', '/projects/{project_id}', self._delete_project),
+            ('POST', '/projects/{project_id}/open', self._open_project),
+            ('POST', '/projects/{project_id}/close', self._close_project),
+            ('POST', '/projects/{project_id}/duplicate', self._duplicate_project),
+            ('GET', '/projects/{project_id}/export', self._export_project),
+            ('POST', '/projects/{project_id}/import', self._import_project),
+            ('GET', '/projects/{project_id}/snapshots', self._list_snapshots),
+            ('POST', '/projects/{project_id}/snapshots', self._create_snapshot),
+            ('DELETE', '/projects/{project_id}/snapshots/{snapshot_id}', self._delete_snapshot),
+            ('POST', '/projects/{project_id}/snapshots/{snapshot_id}/restore', self._restore_snapshot),
+            ('POST', '/projects/{project_id}/templates/{template_id}', self._create_node_from_template),
+            ('GET', '/projects/{project_id}/nodes', self._list_nodes),
+            ('POST', '/projects/{project_id}/nodes', self._create_node),
+            ('GET', '/projects/{project_id}/nodes/{node_id}', self._get_node),
+            ('PUT', '/projects/{project_id}/nodes/{node_id}', self._update_node),
+            ('DELETE', '/projects/{project_id}/nodes/{node_id}', self._delete_node),
+            ('POST', '/projects/{project_id}/nodes/{node_id}/start', self._start_node),
+            ('POST', '/projects/{project_id}/nodes/{node_id}/stop', self._stop_node),
+            ('POST', '/projects/{project_id}/nodes/{node_id}/reload', self._reload_node),
+            ('POST', '/projects/{project_id}/nodes/{node_id}/suspend', self._suspend_node),
+            ('GET', '/projects/{project_id}/links', self._list_links),
+            ('POST', '/projects/{project_id}/links', self._create_link),
+            ('GET', '/projects/{project_id}/links/{link_id}', self._get_link),
+            ('PUT', '/projects/{project_id}/links/{link_id}', self._update_link),
+            ('DELETE', '/projects/{project_id}/links/{link_id}', self._delete_link),
+            ('POST', '/projects/{project_id}/links/{link_id}/start_capture', self._start_capture),
+            ('POST', '/projects/{project_id}/links/{link_id}/stop_capture', self._stop_capture),
+            ('GET', '/projects/{project_id}/links/{link_id}/pcap', self._get_pcap),
+            ('GET', '/projects/{project_id}/drawings', self._list_drawings),
+            ('POST', '/projects/{project_id}/drawings', self._create_drawing),
+            ('GET', '/projects/{project_id}/drawings/{drawing_id}', self._get_drawing),
+            ('PUT', '/projects/{project_id}/drawings/{drawing_id}', self._update_drawing),
+            ('DELETE', '/projects/{project_id}/drawings/{drawing_id}', self._delete_drawing),
+            ('GET', '/computes', self._list_computes),
+            ('POST', '/computes', self._create_compute),
+            ('GET', '/computes/{compute_id}', self._get_compute),
+            ('PUT', '/computes/{compute_id}', self._update_compute),
+            ('DELETE', '/computes/{compute_id}', self._delete_compute),
+            ('GET', '/computes/{compute_id}/{emulator}/images', self._list_images),
+            ('GET', '/computes/{compute_id}/{emulator}/images/{filename}', self._download_image),
+            ('POST', '/computes/{compute_id}/{emulator}/images/{filename}', self._upload_image),
+        ]
+
+    def handle(self, method: str, url: str, body: Optional[bytes] = None, headers: dict = None) -> tuple:
+        """Handles a request and returns the response as a (status code, content type, body) tuple"""
+        with self.concurrency.track():
+            return self._handle(method, url, body, headers)
+
+    def _handle(self, method: str, url: str, body: Optional[bytes], headers: Optional[dict]) -> tuple:
+        if self.latency:
+            time.sleep(self.latency)
+        o = urlsplit(url)
+        path = re.sub(r'^.*?/v2(?=/|$)', '', o.path).rstrip('/') or '/'
+        query = {k: v[-1] for k, v in parse_qs(o.query).items()}
+        try:
+            for route_method, pattern, handler in self._routes:
+                match = pattern.match(path)
+                if match and route_method == method:
+                    with self._lock:
+                        data = handler(body=body, query=query, headers=headers or {}, **match.groupdict())
+                    break
+            else:
+                raise FakeError(404, f'{method} {path} not found')
+        except FakeError as e:
+            return e.status, 'application/json', json.dumps({'message': e.message, 'status': e.status}).encode()
+        if isinstance(data, tuple):
+            status, data = data
+        else:
+            status = 200
+        if isinstance(data, bytes):
+            return status, 'application/octet-stream', data
+        return status, 'application/json', json.dumps(data).encode()
+
+    @staticmethod
+    def _json(body: Optional[bytes]) -> dict:
+        """Returns the JSON request body as a dict"""
+        if not body:
+            return dict()
+        try:
+            return json.loads(body)
+        except ValueError:
+            raise FakeError(400, 'Invalid JSON body')
+
+    @staticmethod
+    def _find(objects: dict, object_id: str, object_type: str) -> dict:
+        """Returns the object with object_id, or answers 404"""
+        try:
+            return objects[object_id]
+        except KeyError:
+            raise FakeError(404, f"{object_type} ID {object_id} doesn't exist")
+
+    def _get_version(self, **_) -> dict:
+        return {'local': False, 'version': '2.2.29'}
+
+    # templates
+
+    def _list_templates(self, **_) -> list:
+        return list(self.templates.values())
+
+    def _create_template(self, body: bytes, **_) -> tuple:
+        data = self._json(body)
+        if 'name' not in data or 'template_type' not in data:
+            raise FakeError(400, 'Template must provide a name and a template_type')
+        template_id = str(uuid.uuid4())
+        template = dict(QEMU_TEMPLATE_DEFAULTS) if data['template_type'] == 'qemu' else {
+            'default_name_format': '{name}-{0}', 'symbol': ':/symbols/computer.svg'}
+        template.update({'builtin': False, 'category': 'guest', 'compute_id': 'local'})
+        template.update(data)
+        template['template_id'] = template_id
+        self.templates[template_id] = template
+        return 201, template
+
+    def _get_template(self, template_id: str, **_) -> dict:
+        return self._find(self.templates, template_id, 'Template')
+
+    def _update_template(self, template_id: str, body: bytes, **_) -> dict:
+        template = self._find(self.templates, template_id, 'Template')
+        if template['builtin']:
+            raise FakeError(403, 'Template is builtin and cannot be modified')
+        template.update({k: v for k, v in self._json(body).items() if k not in ('template_id', 'builtin')})
+        return template
+
+    def _delete_template(self, template_id: str, **_) -> tuple:
+        template = self._find(self.templates, template_id, 'Template')
+        if template['builtin']:
+            raise FakeError(403, 'Template is builtin and cannot be deleted')
+        del self.templates[template_id]
+        return 204, b''
+
+    # projects
+
+    def _list_projects(self, **_) -> list:
+        return list(self.projects.values())
+
+    def _check_project_name(self, name: str, project_id: str = None) -> None:
+        if any(p['name'] == name and p['project_id'] != project_id for p in self.projects.values()):
+            raise FakeError(409, f"Project '{name}' already exists")
+
+    def _create_project(self, body: bytes, **_) -> tuple:
+        data = self._json(body)
+        if 'name' not in data:
+            raise FakeError(400, 'Project must provide a name')
+        self._check_project_name(data['name'])
+        project_id = data.get('project_id') or str(uuid.uuid4())
+        project = dict(PROJECT_DEFAULTS)
+        project.update(data)
+        project.update({
+            'project_id': project_id,
+            'filename': f"{data['name']}.gns3",
+            'path': f'/opt/gns3/projects/{project_id}',
+            'status': 'opened'
+        })
+        self.projects[project_id] = project
+        self.nodes[project_id] = dict()
+        self.links[project_id] = dict()
+        self.drawings[project_id] = dict()
+        self._node_names[project_id] = set()
+        self._used_ports[project_id] = dict()
+        self.snapshots[project_id] = dict()
+        return 201, project
+
+    def _get_project(self, project_id: str, **_) -> dict:
+        return self._find(self.projects, project_id, 'Project')
+
+    def _update_project(self, project_id: str, body: bytes, **_) -> dict:
+        project = self._find(self.projects, project_id, 'Project')
+        data = self._json(body)
+        if 'name' in data:
+            self._check_project_name(data['name'], project_id)
+        project.update({k: v for k, v in data.items() if k not in ('project_id', 'filename', 'path', 'status')})
+        return project
+
+    def _delete_project(self, project_id: str, **_) -> tuple:
+        self._find(self.projects, project_id, 'Project')
+        for node_id in self.nodes[project_id]:
+            del self._node_ports[node_id]
+        for snapshot_id in self.snapshots[project_id]:
+            del self._snapshot_states[snapshot_id]
+        for objects in self.projects, self.nodes, self.links, self.drawings, self._node_names, self._used_ports, \
+                self.snapshots:
+            del objects[project_id]
+        self._opening_until.pop(project_id, None)
+        return 204, b''
+
+    def _open_project(self, project_id: str, **_) -> tuple:
+        project = self._find(self.projects, project_id, 'Project')
+        project['status'] = 'opened'
+        return 201, project
+
+    def _close_project(self, project_id: str, **_) -> tuple:
+        project = self._find(self.projects, project_id, 'Project')
+        project['status'] = 'closed'
+        for node in self.nodes[project_id].values():
+            node['status'] = 'stopped'
+        return 204, b''
+
+    def _duplicate_project(self, project_id: str, body: bytes, **_) -> tuple:
+        data = self._json(body)
+        if 'name' not in data:
+            raise FakeError(400, 'Project must provide a name')
+        self._check_project_name(data['name'])
+        return self._import_project(str(uuid.uuid4()), self._export_project(project_id), {'name': data['name']})
+
+    def _export_project(self, project_id: str, **_) -> bytes:
+        project = self._find(self.projects, project_id, 'Project')
+        topology = {
+            'nodes': list(self.nodes[project_id].values()),
+            'links': list(self.links[project_id].values()),
+            'drawings': list(self.drawings[project_id].values())
+        }
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as z:
+            z.writestr('project.gns3', json.dumps(dict(project, topology=topology)))
+        return archive.getvalue()
+
+    def _import_project(self, project_id: str, body: bytes, query: dict, **_) -> tuple:
+        if project_id in self.projects:
+            raise FakeError(409, f'Project ID {project_id} already exists')
+        try:
+            with zipfile.ZipFile(io.BytesIO(body or b'')) as z:
+                data = json.loads(z.read('project.gns3'))
+        except (zipfile.BadZipFile, KeyError, ValueError):
+            raise FakeError(400, 'Invalid project archive')
+        topology = data.pop('topology')
+        data.update({'project_id': project_id, 'name': query.get('name') or data['name']})
+        for k in 'filename', 'path', 'status':
+            data.pop(k, None)
+        _, project = self._create_project(json.dumps(data).encode())
+        node_ids = dict()
+        for node in topology['nodes']:
+            node_ids[node['node_id']] = self._new_node(project_id, dict(node, node_id=None))['node_id']
+        for link in topology['links']:
+            link = dict(link, project_id=project_id, nodes=[dict(n, node_id=node_ids[n['node_id']])
+                                                            for n in link['nodes']])
+            self.links[project_id][link['link_id']] = link
+            self._use_ports(project_id, link)
+        for drawing in topology['drawings']:
+            self.drawings[project_id][drawing['drawing_id']] = dict(drawing, project_id=project_id)
+        return 201, project
+
+    # snapshots
+
+    def _list_snapshots(self, project_id: str, **_) -> list:
+        return list(self._project_objects(self.snapshots, project_id).values())
+
+    def _create_snapshot(self, project_id: str, body: bytes, **_) -> tuple:
+        snapshots = self._project_objects(self.snapshots, project_id)
+        data = self._json(body)
+        if 'name' not in data:
+            raise FakeError(400, 'Snapshot must provide a name')
+        if any(t['name'] == data['name'] for t in snapshots.values()):
+            raise FakeError(409, f"The snapshot name {data['name']} already exists")
+        snapshot_id = str(uuid.uuid4())
+        snapshot = {'snapshot_id': snapshot_id, 'name': data['name'], 'created_at': int(time.time()),
+                    'project_id': project_id}
+        snapshots[snapshot_id] = snapshot
+        self._snapshot_states[snapshot_id] = copy.deepcopy({
+            'nodes': self.nodes[project_id],
+            'links': self.links[project_id],
+            'drawings': self.drawings[project_id],
+            'node_names': self._node_names[project_id],
+            'used_ports': self._used_ports[project_id]
+        })
+        return 201, snapshot
+
+    def _delete_snapshot(self, project_id: str, snapshot_id: str, **_) -> tuple:
+        self._find(self._project_objects(self.snapshots, project_id), snapshot_id, 'Snapshot')
+        del self.snapshots[project_id][snapshot_id]
+        del self._snapshot_states[snapshot_id]
+        return 204, b''
+
+    def _restore_snapshot(self, project_id: str, snapshot_id: str, **_) -> tuple:
+        self._find(self._project_objects(self.snapshots, project_id), snapshot_id, 'Snapshot')
+        state = copy.deepcopy(self._snapshot_states[snapshot_id])
+        for node_id in self.nodes[project_id]:
+            del self._node_ports[node_id]
+        for link_id in self.links[project_id]:
+            self.captures.pop(link_id, None)
+        for node in state['nodes'].values():
+            node['status'] = 'stopped'
+            self._set_ports(node)
+        self.nodes[project_id] = state['nodes']
+        self.links[project_id] = state['links']
+        self.drawings[project_id] = state['drawings']
+        self._node_names[project_id] = state['node_names']
+        self._used_ports[project_id] = state['used_ports']
+        if self.restore_time:
+            self._opening_until[project_id] = time.monotonic() + self.restore_time
+        return 201, self.projects[project_id]
+
+    # nodes
+
+    def _project_objects(self, objects: dict, project_id: str) -> dict:
+        """Returns the objects of project_id, e.g. nodes, links or drawings"""
+        project = self._find(self.projects, project_id, 'Project')
+        if project['status'] == 'closed':
+            raise FakeError(409, f'Project {project_id} is closed')
+        if time.monotonic() < self._opening_until.get(project_id, 0):
+            raise FakeError(409, f'Project {project_id} is being opened')
+        return objects[project_id]
+
+    def _list_nodes(self, project_id: str, **_) -> list:
+        return list(self._project_objects(self.nodes, project_id).values())
+
+    def _allocate_node_name(self, project_id: str, name_format: str, base_name: str) -> str:
+        """Returns the first node name built from name_format that is not used in project_id"""
+        names = self._node_names[project_id]
+        if '{0}' not in name_format and '{id}' not in name_format:
+            name_format += '{0}'
+        number = 1
+        while True:
+            name = name_format.replace('{id}', '{0}').format(number, name=base_name)
+            if name not in names:
+                return name
+            number += 1
+
+    def _unique_node_name(self, project_id: str, name: str) -> str:
+        """Returns name if not used in project_id, otherwise name followed by the first free number"""
+        if name not in self._node_names[project_id]:
+            return name
+        return self._allocate_node_name(project_id, re.sub(r'\d+$', '', name), name)
+
+    def _set_ports(self, node: dict) -> None:
+        """Sets the ports of a node and indexes them by (adapter_number, port_number)"""
+        node['ports'] = self._ports(node)
+        self._node_ports[node['node_id']] = {(p['adapter_number'], p['port_number']): p for p in node['ports']}
+
+    @staticmethod
+    def _ports(node: dict) -> list:
+        """Returns the ports of a node, depending on its type and adapters"""
+        data_link_types = {'Ethernet': 'DLT_EN10MB'}
+        node_type = node['node_type']
+        if node_type == 'nat':
+            names = [('nat0', 'nat0', 0, 0)]
+        elif node_type == 'cloud':
+            names = [('eth0', 'eth0', 0, 0), ('eth1', 'eth1', 0, 1)]
+        elif node_type in ('ethernet_switch', 'ethernet_hub'):
+            names = [(f'Ethernet{n}', f'e{n}', 0, n) for n in range(8)]
+        else:
+            adapters = node['properties'].get('adapters', 1)
+            port_name_format = node.get('port_name_format') or 'Ethernet{0}'
+            names = [(port_name_format.format(n), f'e{n}', n, 0) for n in range(adapters)]
+        return [{
+            'adapter_number': adapter_number,
+            'data_link_types': data_link_types,
+            'link_type': 'ethernet',
+            'name': name,
+            'port_number': port_number,
+            'short_name': short_name
+        } for name, short_name, adapter_number, port_number in names]
+
+    def _new_node(self, project_id: str, data: dict) -> dict:
+        """Creates a node in project_id from data and returns it"""
+        node_id = data.get('node_id') or str(uuid.uuid4())
+        node_type = data['node_type']
+        properties = dict(data.get('properties') or {})
+        if self.payload_size:
+            properties['usage'] = 'x' * self.payload_size
+        console_type = data.get('console_type') or ('telnet' if node_type in ('qemu', 'vpcs') else 'none')
+        console = None
+        if console_type != 'none':
+            self._console_port += 1
+            console = self._console_port
+        node = {
+            'command_line': '',
+            'compute_id': data.get('compute_id', 'local'),
+            'console': console,
+            'console_auto_start': False,
+            'console_host': '127.0.0.1',
+            'console_type': console_type,
+            'custom_adapters': [],
+            'first_port_name': '',
+            'height': 59,
+            'label': {'rotation': 0, 'style': None, 'text': data['name'], 'x': None, 'y': -40},
+            'locked': False,
+            'name': data['name'],
+            'node_directory': f'/opt/gns3/projects/{project_id}/project-files/{node_type}/{node_id}',
+            'node_id': node_id,
+            'node_type': node_type,
+            'port_name_format': 'Ethernet{0}',
+            'port_segment_size': 0,
+            'project_id': project_id,
+            'properties': properties,
+            'status': 'stopped',
+            'symbol': data.get('symbol') or ':/symbols/computer.svg',
+            'template_id': data.get('template_id'),
+            'width': 65,
+            'x': 0,
+            'y': 0,
+            'z': 1
+        }
+        node.update({k: v for k, v in data.items() if k in NODE_WRITABLE_ATTRIBUTES and k != 'properties'})
+        self._set_ports(node)
+        self.nodes[project_id][node_id] = node
+        self._node_names[project_id].add(node['name'])
+        return node
+
+    def _create_node(self, project_id: str, body: bytes, **_) -> tuple:
+        self._project_objects(self.nodes, project_id)
+        data = self._json(body)
+        if 'name' not in data or 'node_type' not in data or 'compute_id' not in data:
+            raise FakeError(400, 'Node must provide a name, a node_type and a compute_id')
+        self._check_compute(data['compute_id'])
+        data['name'] = self._unique_node_name(project_id, data['name'])
+        return 201, self._new_node(project_id, data)
+
+    def _create_node_from_template(self, project_id: str, template_id: str, body: bytes, **_) -> tuple:
+        self._project_objects(self.nodes, project_id)
+        template = self._find(self.templates, template_id, 'Template')
+        data = self._json(body)
+        unknown = set(data) - {'name', 'compute_id', 'x', 'y'}
+        if unknown:
+            raise FakeError(400, f'Additional properties are not allowed ({", ".join(sorted(unknown))})')
+        if data.get('compute_id'):
+            self._check_compute(data['compute_id'])
+        name_format = template.get('default_name_format') or '{name}-{0}'
+        if 'name' in data:
+            name = self._unique_node_name(project_id, data['name'])
+        else:
+            name = self._allocate_node_name(project_id, name_format, template['name'])
+        node = {
+            'name': name,
+            'node_type': template['template_type'],
+            'compute_id': data.get('compute_id') or template.get('compute_id') or 'local',
+            'console_type': template.get('console_type'),
+            'symbol': template.get('symbol'),
+            'template_id': template_id,
+            'x': data.get('x', 0),
+            'y': data.get('y', 0),
+            'properties': {k: v for k, v in template.items() if k in QEMU_PROPERTIES}
+        }
+        return 201, self._new_node(project_id, node)
+
+    def _get_node(self, project_id: str, node_id: str, **_) -> dict:
+        return self._find(self._project_objects(self.nodes, project_id), node_id, 'Node')
+
+    def _update_node(self, project_id: str, node_id: str, body: bytes, **_) -> dict:
+        node = self._get_node(project_id, node_id)
+        data = self._json(body)
+        self._node_names[project_id].discard(node['name'])
+        node.update({k: v for k, v in data.items() if k in NODE_WRITABLE_ATTRIBUTES and k != 'properties'})
+        self._node_names[project_id].add(node['name'])
+        if 'properties' in data:
+            node['properties'].update(data['properties'])
+            self._set_ports(node)
+        return node
+
+    def _delete_node(self, project_id: str, node_id: str, **_) -> tuple:
+        node = self._get_node(project_id, node_id)
+        del self.nodes[project_id][node_id]
+        del self._node_ports[node_id]
+        self._node_names[project_id].discard(node['name'])
+        links = self.links[project_id]
+        for link_id in [k for k, v in links.items() if any(n['node_id'] == node_id for n in v['nodes'])]:
+            self._release_ports(project_id, links.pop(link_id))
+        return 204, b''
+
+    def _set_node_status(self, project_id: str, node_id: str, status: str) -> dict:
+        node = self._get_node(project_id, node_id)
+        node['status'] = status
+        return node
+
+    def _start_node(self, project_id: str, node_id: str, **_) -> dict:
+        return self._set_node_status(project_id, node_id, 'started')
+
+    def _stop_node(self, project_id: str, node_id: str, **_) -> dict:
+        return self._set_node_status(project_id, node_id, 'stopped')
+
+    def _reload_node(self, project_id: str, node_id: str, **_) -> dict:
+        return self._set_node_status(project_id, node_id, 'started')
+
+    def _suspend_node(self, project_id: str, node_id: str, **_) -> dict:
+        return self._set_node_status(project_id, node_id, 'suspended')
+
+    # links
+
+    def _list_links(self, project_id: str, **_) -> list:
+        return list(self._project_objects(self.links, project_id).values())
+
+    def _link_ends(self, project_id: str, ends: list, link_id: str = None) -> list:
+        """Checks link ends and returns them with their labels"""
+        if not isinstance(ends, list) or len(ends) != 2:
+            raise FakeError(400, 'Link must provide 2 nodes')
+        result = list()
+        for end in ends:
+            node = self._find(self.nodes[project_id], end.get('node_id'), 'Node')
+            port = self._node_ports[node['node_id']].get((end.get('adapter_number'), end.get('port_number')))
+            if not port:
+                raise FakeError(409, f"Port {end.get('adapter_number')}/{end.get('port_number')} doesn't exist on "
+                                     f"node {node['name']}")
+            if self._used_ports[project_id].get((node['node_id'], port['adapter_number'], port['port_number']),
+                                                link_id) != link_id:
+                raise FakeError(409, f"Port {port['adapter_number']}/{port['port_number']} is already used")
+            label = {'rotation': 0, 'style': 'font-size: 10; font-style: Verdana', 'text': port['short_name'],
+                     'x': 0, 'y': 0}
+            label.update(end.get('label') or {})
+            result.append({'adapter_number': port['adapter_number'], 'label': label, 'node_id': node['node_id'],
+                           'port_number': port['port_number']})
+        return result
+
+    def _use_ports(self, project_id: str, link: dict) -> None:
+        """Records the ports used by link"""
+        for n in link['nodes']:
+            self._used_ports[project_id][(n['node_id'], n['adapter_number'], n['port_number'])] = link['link_id']
+
+    def _release_ports(self, project_id: str, link: dict) -> None:
+        """Releases the ports used by link"""
+        for n in link['nodes']:
+            self._used_ports[project_id].pop((n['node_id'], n['adapter_number'], n['port_number']), None)
+
+    def _create_link(self, project_id: str, body: bytes, **_) -> tuple:
+        self._project_objects(self.links, project_id)
+        data = self._json(body)
+        link_id = str(uuid.uuid4())
+        link = {
+            'capture_compute_id': None,
+            'capture_file_name': None,
+            'capture_file_path': None,
+            'capturing': False,
+            'filters': {},
+            'link_id': link_id,
+            'link_style': {},
+            'link_type': 'ethernet',
+            'nodes': self._link_ends(project_id, data.get('nodes')),
+            'project_id': project_id,
+            'suspend': False
+        }
+        link.update({k: v for k, v in data.items() if k in LINK_WRITABLE_ATTRIBUTES})
+        self.links[project_id][link_id] = link
+        self._use_ports(project_id, link)
+        return 201, link
+
+    def _get_link(self, project_id: str, link_id: str, **_) -> dict:
+        return self._find(self._project_objects(self.links, project_id), link_id, 'Link')
+
+    def _update_link(self, project_id: str, link_id: str, body: bytes, **_) -> dict:
+        link = self._get_link(project_id, link_id)
+        data = self._json(body)
+        if 'nodes' in data:
+            ends = self._link_ends(project_id, data['nodes'], link_id)
+            self._release_ports(project_id, link)
+            link['nodes'] = ends
+            self._use_ports(project_id, link)
+        unknown = set(data.get('filters') or {}) - set(LINK_FILTERS)
+        if unknown:
+            raise FakeError(409, f'Filter {", ".join(sorted(unknown))} is not available')
+        link.update({k: v for k, v in data.items() if k in LINK_WRITABLE_ATTRIBUTES})
+        return link
+
+    @staticmethod
+    def _pcap(packets: int) -> bytes:
+        """Returns a pcap file of ethernet frames"""
+        header = struct.pack('<IHHiIII', 0xa1b2c3d4, 2, 4, 0, 0, 65535, 1)
+        frame = bytes(range(64))
+        return header + b''.join(struct.pack('<IIII', n, 0, len(frame), len(frame)) + frame for n in range(packets))
+
+    def _start_capture(self, project_id: str, link_id: str, body: bytes, **_) -> tuple:
+        link = self._get_link(project_id, link_id)
+        data = self._json(body)
+        if link['capturing']:
+            raise FakeError(409, f'Link {link_id} is already capturing')
+        filename = data.get('capture_file_name') or f'capture-{link_id[:8]}.pcap'
+        node = self.nodes[project_id][link['nodes'][0]['node_id']]
+        link.update({'capturing': True, 'capture_file_name': filename, 'capture_compute_id': node['compute_id'],
+                     'capture_file_path': f'/projects/{project_id}/project-files/captures/{filename}'})
+        self.captures[link_id] = self._pcap(self.capture_packets)
+        return 201, link
+
+    def _stop_capture(self, project_id: str, link_id: str, **_) -> tuple:
+        link = self._get_link(project_id, link_id)
+        link['capturing'] = False
+        return 201, link
+
+    def _get_pcap(self, project_id: str, link_id: str, **_) -> bytes:
+        self._get_link(project_id, link_id)
+        if link_id not in self.captures:
+            raise FakeError(404, f'Link {link_id} has no capture file')
+        return self.captures[link_id]
+
+    def _delete_link(self, project_id: str, link_id: str, **_) -> tuple:
+        self._release_ports(project_id, self._get_link(project_id, link_id))
+        del self.links[project_id][link_id]
+        self.captures.pop(link_id, None)
+        return 204, b''
+
+    # drawings
+
+    def _list_drawings(self, project_id: str, **_) -> list:
+        return list(self._project_objects(self.drawings, project_id).values())
+
+    def _create_drawing(self, project_id: str, body: bytes, **_) -> tuple:
+        self._project_objects(self.drawings, project_id)
+        drawing_id = str(uuid.uuid4())
+        drawing = {'drawing_id': drawing_id, 'locked': False, 'project_id': project_id, 'rotation': 0,
+                   'svg': '<svg height="100" width="100"></svg>', 'x': 0, 'y': 0, 'z': 1}
+        drawing.update({k: v for k, v in self._json(body).items() if k in DRAWING_WRITABLE_ATTRIBUTES})
+        self.drawings[project_id][drawing_id] = drawing
+        return 201, drawing
+
+    def _get_drawing(self, project_id: str, drawing_id: str, **_) -> dict:
+        return self._find(self._project_objects(self.drawings, project_id), drawing_id, 'Drawing')
+
+    def _update_drawing(self, project_id: str, drawing_id: str, body: bytes, **_) -> dict:
+        drawing = self._get_drawing(project_id, drawing_id)
+        drawing.update({k: v for k, v in self._json(body).items() if k in DRAWING_WRITABLE_ATTRIBUTES})
+        return drawing
+
+    def _delete_drawing(self, project_id: str, drawing_id: str, **_) -> tuple:
+        self._get_drawing(project_id, drawing_id)
+        del self.drawings[project_id][drawing_id]
+        return 204, b''
+
+    # computes
+
+    def add_compute(self, compute_id: str, host: str, port: int = 3080, cpus: int = 8, memory: int = 16 * 1024 ** 3,
+                    cpu_usage_percent: float = 0.0, memory_usage_percent: float = 0.0, connected: bool = True,
+                    node_types: list = None) -> dict:
+        """Adds a compute with the given capacity and usage, and returns it"""
+        compute = {
+            'compute_id': compute_id,
+            'name': compute_id,
+            'protocol': 'http',
+            'host': host,
+            'port': port,
+            'user': None,
+            'connected': connected,
+            'cpu_usage_percent': cpu_usage_percent,
+            'memory_usage_percent': memory_usage_percent,
+            'disk_usage_percent': 0.0,
+            'last_error': None,
+            'capabilities': {
+                'cpus': cpus,
+                'disk_size': 512 * 1024 ** 3,
+                'memory': memory,
+                'node_types': list(node_types or COMPUTE_NODE_TYPES),
+                'platform': 'linux',
+                'version': '2.2.29'
+            }
+        }
+        self.computes[compute_id] = compute
+        return compute
+
+    def _check_compute(self, compute_id: str) -> None:
+        """Answers 404 if compute_id is not a compute of the fake server"""
+        self._find(self.computes, compute_id, 'Compute')
+
+    def _list_computes(self, **_) -> list:
+        return list(self.computes.values())
+
+    def _create_compute(self, body: bytes, **_) -> tuple:
+        data = self._json(body)
+        if 'protocol' not in data or 'host' not in data or 'port' not in data:
+            raise FakeError(400, 'Compute must provide a protocol, a host and a port')
+        compute_id = data.get('compute_id') or str(uuid.uuid4())
+        if compute_id in self.computes:
+            raise FakeError(409, f'Compute ID {compute_id} already exists')
+        compute = self.add_compute(compute_id, data['host'], data['port'])
+        compute.update({k: v for k, v in data.items() if k in COMPUTE_WRITABLE_ATTRIBUTES})
+        return 201, compute
+
+    def _get_compute(self, compute_id: str, **_) -> dict:
+        return self._find(self.computes, compute_id, 'Compute')
+
+    def _update_compute(self, compute_id: str, body: bytes, **_) -> dict:
+        compute = self._find(self.computes, compute_id, 'Compute')
+        compute.update({k: v for k, v in self._json(body).items() if k in COMPUTE_WRITABLE_ATTRIBUTES})
+        return compute
+
+    def _delete_compute(self, compute_id: str, **_) -> tuple:
+        self._find(self.computes, compute_id, 'Compute')
+        del self.computes[compute_id]
+        return 204, b''
+
+    # images
+
+    def _compute_images(self, compute_id: str, emulator: str) -> dict:
+        """Returns the images of an emulator on a compute, by filename"""
+        return self.images.setdefault((compute_id, emulator), dict())
+
+    def _list_images(self, compute_id: str, emulator: str, **_) -> list:
+        return [{'filename': filename, 'path': filename, 'md5sum': hashlib.md5(content).hexdigest(),
+                 'filesize': len(content)} for filename, content in self._compute_images(compute_id, emulator).items()]
+
+    def _download_image(self, compute_id: str, emulator: str, filename: str, headers: dict, **_) -> tuple:
+        filename = unquote(filename)
+        content = self._find(self._compute_images(compute_id, emulator), filename, 'Image')
+        match = re.match(r'bytes=(\d+)-$', headers.get('Range', ''))
+        if not match:
+            return 200, content
+        offset = int(match.group(1))
+        if offset >= len(content):
+            raise FakeError(416, 'Requested range not satisfiable')
+        return 206, content[offset:]
+
+    def _upload_image(self, compute_id: str, emulator: str, filename: str, body: bytes, headers: dict, **_) -> tuple:
+        images = self._compute_images(compute_id, emulator)
+        filename = unquote(filename)
+        match = re.match(r'bytes (\d+)-\d+/\d+$', headers.get('Content-Range', ''))
+        if not match:
+            images[filename] = body or b''
+            return 204, b''
+        if int(match.group(1)) != len(images.get(filename, b'')):
+            raise FakeError(416, 'Content range does not start at the end of the image')
+        images[filename] += body or b''
+        return 204, b''
+
+
+class FakeAdapter(HTTPAdapter):
+    """Requests transport adapter answering requests with a FakeGNS3Server instead of the network"""
+
+    def __init__(self, fake: FakeGNS3Server = None) -> None:
+        super(FakeAdapter, self).__init__()
+        self.fake = fake or FakeGNS3Server()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        body = request.body
+        if body is not None and not isinstance(body, (bytes, str)):
+            body = b''.join(chunk if isinstance(chunk, bytes) else chunk.encode() for chunk in body)
+        if isinstance(body, str):
+            body = body.encode()
+        status, content_type, content = self.fake.handle(request.method, request.url, body, dict(request.headers))
+        raw = HTTPResponse(body=io.BytesIO(content), headers={'Content-Type': content_type,
+                                                              'Content-Length': str(len(content))},
+                           status=status, preload_content=False, decode_content=False)
+        return self.build_response(request, raw)
+
+
+class _FakeRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _read_body(self) -> bytes:
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = list()
+            while True:
+                size = int(self.rfile.readline().split(b';')[0], 16)
+                if not size:
+                    self.rfile.readline()
+                    return b''.join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+    def _handle(self) -> None:
+        status, content_type, content = self.server.fake.handle(self.command, self.path, self._read_body(),
+                                                                dict(self.headers))
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class FakeHTTPServer(ThreadingHTTPServer):
+    """Local HTTP server answering requests with a FakeGNS3Server, served from a background thread"""
+    daemon_threads = True
+
+    def __init__(self, fake: FakeGNS3Server = None, host: str = '127.0.0.1', port: int = 0) -> None:
+        super(FakeHTTPServer, self).__init__((host, port), _FakeRequestHandler)
+        self.fake = fake or FakeGNS3Server()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Returns the base URL to give to Server"""
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/v2'
+
+    def start(self):
+        """Starts serving requests in a background thread"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops serving requests"""
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+class _FakeTelnetHandler(socketserver.BaseRequestHandler):
+    _IAC = re.compile(rb'\xff[\xfb-\xfe].|\xff[^\xfb-\xfe]', re.DOTALL)
+
+    def handle(self) -> None:
+        server = self.server
+        # will echo, will suppress go ahead
+        self.request.sendall(b'\xff\xfb\x01\xff\xfb\x03' + f'\r\n{server.prompt}'.encode())
+        buffer = b''
+        while True:
+            data = self.request.recv(4096)
+            if not data:
+                return
+            buffer += self._IAC.sub(b'', data).replace(b'\0', b'')
+            while b'\n' in buffer:
+                line, buffer = buffer.split(b'\n', 1)
+                line = line.rstrip(b'\r').decode()
+                with server.concurrency.track():
+                    if line:
+                        server.received.append(line)
+                    time.sleep(server.delay)
+                self.request.sendall(f'{line}\r\n{server.prompt}'.encode())
+
+
+class FakeTelnetServer(socketserver.ThreadingTCPServer):
+    """Local telnet server faking a node console, served from a background thread
+
+    Each line received is recorded, then echoed after delay seconds and followed by prompt. Lines being handled at once
+    are counted by concurrency, a new ConcurrencyCounter unless one is shared.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, prompt: str = 'R1#', delay: float = 0.0, host: str = '127.0.0.1', port: int = 0,
+                 concurrency: ConcurrencyCounter = None) -> None:
+        super(FakeTelnetServer, self).__init__((host, port), _FakeTelnetHandler)
+        self.prompt = prompt
+        self.delay = delay
+        self.received = list()
+        self.concurrency = concurrency or ConcurrencyCounter()
+        self._thread = None
+
+    @property
+    def host(self) -> str:
+        return self.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self):
+        """Starts serving sessions in a background thread, polling often so that many consoles stop quickly"""
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops serving sessions"""
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
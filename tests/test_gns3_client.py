@@ -1,11 +1,22 @@
 import unittest
 import logzero
 import os
-from gns3_client import Server, Template, TemplateList, Project, ProjectList, Drawing, DrawingList, DrawingMetadata, Node, \
-    NodeList, Link, LinkList
+import io
+import json
+import time
+import timeit
+import asyncio
+import hashlib
+import tempfile
+from gns3_client import Server, Template, TemplateList, Project, ProjectList, Drawing, DrawingList, DrawingMetadata, \
+    Node, NodeMetadata, NodeList, Link, LinkList, LinkFilters, Snapshot, RequestBudgetExceeded, Fleet, \
+    InvalidParameters, BaseObjectMetadata, _iter_json_array, _split_svg_name, _join_svg_name
+from gns3_client.fake import FakeGNS3Server, FakeAdapter, FakeHTTPServer, FakeTelnetServer, ConcurrencyCounter
+from gns3_client.console import Console, ConsolePool
 
 if 'GNS3_SERVER_URL' not in os.environ:
-    raise Exception('You must set environement variable GNS3_SERVER_URL')
+    # no GNS3 test server provided: run against the bundled fake server
+    GNS3_SERVER_URL = FakeHTTPServer().start().url
 else:
     GNS3_SERVER_URL = os.environ['GNS3_SERVER_URL']
 
@@ -23,6 +34,442 @@ class TestServer(unittest.TestCase):
         version = self.server.version()
         self.assertIn('version', version)
 
+    def test_expect_requests(self):
+        with self.server.expect_requests(max=2) as counter:
+            self.server.version()
+            self.server.version()
+            self.server.get(url='/projects/0f1bc4a4-0c83-4d6a-8bd7-ea8b7a4d6e2c')
+        self.assertEqual(counter.calls[('GET', '/version')], 1)
+        self.assertEqual(counter.calls[('GET', '/projects/{id}')], 1)
+
+    def test_expect_requests_exceeded(self):
+        self.server.cache.clear()
+        with self.assertRaises(RequestBudgetExceeded):
+            with self.server.expect_requests(max=0):
+                self.server.version()
+        self.server.cache.clear()
+        with self.server.expect_requests(max=0, strict=False) as counter:
+            self.server.version()
+        self.assertEqual(counter.total, 1)
+
+
+class TestFakeServer(unittest.TestCase):
+    FAKE_URL = 'http://gns3.fake/v2'
+
+    def setUp(self):
+        self.fake = FakeGNS3Server()
+        self.server = Server(self.FAKE_URL)
+        self.server.mount('http://gns3.fake/', FakeAdapter(self.fake))
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_adapter(self):
+        project = Project(name='test_project', server=self.server)
+        project.create()
+        self.assertIn(project.metadata.project_id, self.fake.projects)
+
+    def test_latency(self):
+        self.fake.latency = 0.05
+        start = time.perf_counter()
+        self.server.version()
+        self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+
+    def test_gather(self):
+        self.fake.latency = 0.1
+        names = [f'test_project{n}' for n in range(8)]
+        start = time.perf_counter()
+        self.server.gather(lambda name: Project(name=name, server=self.server).create(), names)
+        self.assertLess(time.perf_counter() - start, len(names) * self.fake.latency / 2)
+        self.assertGreater(self.fake.concurrency.peak, 1)
+        self.assertEqual(set(names), {t['name'] for t in self.fake.projects.values()})
+
+    def test_load_parallel(self):
+        project = Project(name='test_project', server=self.server)
+        project.create()
+        self.fake.latency = 0.1
+        durations, peaks = dict(), dict()
+        for parallel in (False, True):
+            self.server.clear_cache()
+            self.fake.concurrency.reset()
+            start = time.perf_counter()
+            project.load(parallel=parallel)
+            durations[parallel] = time.perf_counter() - start
+            peaks[parallel] = self.fake.concurrency.peak
+        self.assertEqual(1, peaks[False])
+        self.assertGreater(peaks[True], 1)
+        self.assertLess(durations[True], durations[False] * 2 / 3)
+
+    def test_payload_size(self):
+        self.fake.payload_size = 1000
+        template = Template(name='test_template', template_type="qemu", server=self.server)
+        template.create()
+        project = Project(name='test_project', server=self.server)
+        project.create()
+        node = Node(name='test_node', template=template, project=project)
+        node.create()
+        self.assertEqual(len(node.metadata.properties['usage']), 1000)
+
+
+class TestConcurrency(unittest.TestCase):
+    FAKE_URL = 'http://gns3.fake/v2'
+
+    def setUp(self):
+        self.fake = FakeGNS3Server()
+        self.server = Server(self.FAKE_URL)
+        self.server.mount('http://gns3.fake/', FakeAdapter(self.fake))
+        self.template = Template(name='test_template', template_type='qemu', server=self.server)
+        self.template.create()
+        self.project = Project(name='test_project', server=self.server)
+        self.project.create()
+
+    def tearDown(self):
+        self.server.close()
+
+    def assertConcurrent(self, func, *args, **kwargs):
+        """Calls func while the fake server has a fixed latency, checks that its requests overlapped and returns its
+        result"""
+        self.server.clear_cache()
+        self.fake.latency = 0.05
+        self.fake.concurrency.reset()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            self.fake.latency = 0.0
+        self.assertGreater(self.fake.concurrency.peak, 1)
+        return result
+
+    def _links(self) -> LinkList:
+        """Creates four nodes connected in pairs by two links, and returns the links of the project"""
+        nodes = self.project.nodes.instantiate(self.template, count=4)
+        self.project.links.connect_many([(nodes[n], (0, 0), nodes[n + 1], (0, 0)) for n in (0, 2)])
+        return self.project.links
+
+    def test_upload_many(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        paths = [os.path.join(directory.name, f'test_image{n}.qcow2') for n in range(4)]
+        for path in paths:
+            with open(path, 'wb') as f:
+                f.write(os.urandom(1000))
+        images = self.assertConcurrent(self.server.images.upload_many, paths)
+        self.assertEqual([os.path.basename(t) for t in paths], [t['filename'] for t in images])
+
+    def test_connect_many(self):
+        nodes = [Node(name=f'R{n}', template=self.template, project=self.project) for n in range(4)]
+        for node in nodes:
+            node.create()
+        self.project.links.pull()
+        links = [(nodes[n], (0, 0), nodes[n + 1], (0, 0)) for n in (0, 2)]
+        result = self.assertConcurrent(self.project.links.connect_many, links)
+        self.assertEqual((2, []), (len(result['created']), result['failed']))
+        self.assertEqual(2, len(self.fake.links[self.project.id]))
+
+    def test_instantiate(self):
+        nodes = self.assertConcurrent(self.project.nodes.instantiate, self.template, count=4)
+        self.assertEqual(4, len(nodes))
+        self.assertEqual({t.metadata.node_id for t in nodes}, set(self.fake.nodes[self.project.id]))
+
+    def test_captures(self):
+        links = self._links()
+        self.assertConcurrent(links.start_captures)
+        self.assertTrue(all(t['capturing'] for t in self.fake.links[self.project.id].values()))
+        self.assertConcurrent(links.stop_captures)
+        self.assertFalse(any(t['capturing'] for t in self.fake.links[self.project.id].values()))
+
+    def test_apply_filters(self):
+        links = self._links()
+        filters = LinkFilters(delay=100, jitter=10)
+        previous = self.assertConcurrent(links.apply_filters, None, filters)
+        self.assertEqual({t: {} for t in links}, previous)
+        self.assertTrue(all(t['filters'] == filters.dict() for t in self.fake.links[self.project.id].values()))
+        self.assertConcurrent(links.revert_filters, previous)
+        self.assertTrue(all(t['filters'] == {} for t in self.fake.links[self.project.id].values()))
+
+    def test_duplicate_many(self):
+        names = [f'test_pool{n}' for n in range(3)]
+        projects = self.assertConcurrent(self.server.projects.duplicate_many, self.project, names)
+        self.assertEqual(names, [t.metadata.name for t in projects])
+        closed = self.assertConcurrent(self.server.projects.close_idle)
+        self.assertCountEqual(['test_project'] + names, [t.metadata.name for t in closed])
+        self.assertTrue(all(t['status'] == 'closed' for t in self.fake.projects.values()))
+
+
+class TestImages(unittest.TestCase):
+    def setUp(self):
+        self.server = Server(GNS3_SERVER_URL)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.content = os.urandom(100000)
+        self.path = os.path.join(self.directory, f'test_image_{self.content[:4].hex()}.qcow2')
+        with open(self.path, 'wb') as f:
+            f.write(self.content)
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_upload(self):
+        image = self.server.images.upload(self.path, chunk_size=4096)
+        self.assertEqual(image['md5sum'], hashlib.md5(self.content).hexdigest())
+        remote_image = self.server.images.find(os.path.basename(self.path))
+        self.assertEqual((image['md5sum'], len(self.content)), (remote_image['md5sum'], remote_image['filesize']))
+
+    def test_upload_identical(self):
+        self.server.images.upload(self.path)
+        self.server.cache.clear()
+        with self.server.expect_requests(max=1) as counter:
+            self.server.images.upload(self.path)
+        self.assertEqual(counter.calls[('GET', '/computes/local/qemu/images')], 1)
+
+    def test_upload_resume(self):
+        partial_path = os.path.join(self.directory, 'partial', os.path.basename(self.path))
+        os.makedirs(os.path.dirname(partial_path))
+        with open(partial_path, 'wb') as f:
+            f.write(self.content[:30000])
+        self.server.images.upload(partial_path)
+        self.server.cache.clear()
+        progress = list()
+        image = self.server.images.upload(self.path, chunk_size=4096,
+                                          progress=lambda done, total: progress.append((done, total)))
+        self.assertEqual((30000 + 4096, len(self.content)), progress[0])
+        self.assertEqual(image['md5sum'], hashlib.md5(self.content).hexdigest())
+        remote_image = self.server.images.find(os.path.basename(self.path))
+        self.assertEqual((image['md5sum'], len(self.content)), (remote_image['md5sum'], remote_image['filesize']))
+
+    def test_upload_many(self):
+        path = os.path.join(self.directory, 'test_image_copy.qcow2')
+        with open(path, 'wb') as f:
+            f.write(self.content[::-1])
+        images = self.server.images.upload_many([self.path, path])
+        self.assertEqual([os.path.basename(self.path), 'test_image_copy.qcow2'], [t['filename'] for t in images])
+
+    def test_download_resume(self):
+        self.server.images.upload(self.path)
+        path = os.path.join(self.directory, 'test_image_download.qcow2')
+        with open(path, 'wb') as f:
+            f.write(self.content[:30000])
+        progress = list()
+        size = self.server.images.download(os.path.basename(self.path), path, chunk_size=4096,
+                                           progress=lambda done, total: progress.append((done, total)))
+        self.assertEqual(size, len(self.content))
+        self.assertEqual((len(self.content), len(self.content)), progress[-1])
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertEqual(len(self.content), self.server.images.download(os.path.basename(self.path), path))
+
+
+class TestComputes(unittest.TestCase):
+    FAKE_URL = 'http://gns3.fake/v2'
+
+    def setUp(self):
+        self.fake = FakeGNS3Server()
+        self.fake.add_compute('vm1', '10.0.0.1', cpus=4, memory=8 * 1024 ** 3, cpu_usage_percent=50.0,
+                              memory_usage_percent=50.0)
+        self.fake.add_compute('vm2', '10.0.0.2', cpus=8, memory=16 * 1024 ** 3, cpu_usage_percent=10.0,
+                              memory_usage_percent=20.0)
+        self.fake.add_compute('remote', '10.0.0.3', connected=False)
+        self.server = Server(self.FAKE_URL)
+        self.server.mount('http://gns3.fake/', FakeAdapter(self.fake))
+        self.template = Template(name='test_template', template_type='qemu', ram=2048, cpus=1, server=self.server)
+        self.template.create()
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_poll(self):
+        self.server.computes.poll()
+        self.assertEqual(['local', 'vm1', 'vm2', 'remote'], [t.metadata.compute_id for t in self.server.computes])
+        self.fake.computes['vm1']['cpu_usage_percent'] = 75.0
+        with self.server.expect_requests(max=1):
+            self.server.computes.poll()
+        self.assertEqual(75.0, self.server.computes[1].metadata.cpu_usage_percent)
+        self.assertEqual(4 * 1024 ** 3, self.server.computes[1].free_memory)
+
+    def test_place(self):
+        self.assertEqual(['local', 'vm1', 'vm2', 'local'], self.server.computes.place(self.template, count=4))
+        self.assertEqual(['vm1'], self.server.computes.place(self.template))
+        self.assertEqual(['local', 'local', 'vm2', 'local'],
+                         self.server.computes.place(self.template, count=4, strategy='least-loaded'))
+        self.template.metadata.ram = 6144
+        self.assertEqual(['local', 'vm2', 'local', 'vm2'],
+                         self.server.computes.place(self.template, count=4, strategy='memory-fit'))
+        with self.assertRaises(InvalidParameters):
+            self.server.computes.place(self.template, count=5, strategy='memory-fit')
+        with self.assertRaises(InvalidParameters):
+            self.server.computes.place(self.template, strategy='random')
+
+    def test_create_nodes(self):
+        project = Project(name='test_project', server=self.server)
+        project.create()
+        node = Node(name='test_node', template=self.template, project=project)
+        node.create(placement='least-loaded')
+        self.assertEqual('local', node.metadata.compute_id)
+        nodes = project.nodes.instantiate(self.template, count=3, placement='round-robin')
+        project.nodes.pull()
+        self.assertEqual({'local', 'vm1', 'vm2'}, set(t.metadata.compute_id for t in project.nodes.data[1:]))
+        self.assertEqual(['local', 'vm1', 'vm2'], [t.metadata.compute_id for t in nodes])
+
+
+class TestSnapshots(unittest.TestCase):
+    FAKE_URL = 'http://gns3.fake/v2'
+
+    def setUp(self):
+        self.fake = FakeGNS3Server()
+        self.server = Server(self.FAKE_URL)
+        self.server.mount('http://gns3.fake/', FakeAdapter(self.fake))
+        template = Template(name='test_template', template_type='qemu', server=self.server)
+        template.create()
+        self.project = Project(name='test_project', server=self.server)
+        self.project.create()
+        node1, node2 = self.project.nodes.instantiate(template, count=2)
+        Link(project=self.project, nodes=[
+            {'adapter_number': 0, 'node': node1, 'port_number': 0},
+            {'adapter_number': 0, 'node': node2, 'port_number': 0}
+        ]).create()
+        self.snapshot = Snapshot(project=self.project, name='baseline')
+        self.snapshot.create()
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_pull(self):
+        Snapshot(project=self.project, name='other').create()
+        self.project.snapshots.pull()
+        self.assertEqual(['baseline', 'other'], [t.metadata.name for t in self.project.snapshots])
+        self.project.snapshots[1].delete()
+        self.project.snapshots.pull()
+        self.assertEqual(1, len(self.project.snapshots))
+
+    def test_restore(self):
+        self.project.load()
+        positions = {t.metadata.name: t.metadata.x for t in self.project.nodes}
+        self.project.links[0].delete()
+        self.project.nodes[0].metadata.x = 500
+        self.project.nodes[0].update()
+        self.project.nodes.pull()
+        self.server.projects.pull()
+        self.fake.restore_time = 0.3
+        with self.server.expect_requests(max=10) as counter:
+            self.snapshot.restore(interval=0.1)
+        self.assertGreaterEqual(counter.calls[('GET', '/projects/{id}/nodes')], 3)
+        self.assertEqual(1, counter.calls[('GET', '/projects/{id}/links')])
+        self.assertEqual(1, counter.calls[('GET', '/projects/{id}/drawings')])
+        self.assertEqual(0, counter.calls[('GET', '/projects')])
+        with self.server.expect_requests(max=0):
+            self.server.projects.pull()
+        self.assertEqual(positions, {t.metadata.name: t.metadata.x for t in self.project.nodes})
+        self.assertEqual(1, len(self.project.links))
+        nodes = {t.metadata.node_id: t for t in self.project.nodes}
+        for end in self.project.links[0].metadata.nodes:
+            self.assertIs(nodes[end['node'].metadata.node_id], end['node'])
+
+    def test_restore_timeout(self):
+        self.fake.restore_time = 5.0
+        with self.assertRaises(TimeoutError):
+            self.snapshot.restore(timeout=0.2, interval=0.1)
+
+
+class TestConsole(unittest.TestCase):
+    def setUp(self):
+        self.concurrency = ConcurrencyCounter()
+        self.consoles = [FakeTelnetServer(prompt=f'R{n}#', delay=0.1, concurrency=self.concurrency).start()
+                         for n in range(4)]
+        self.nodes = [Node(name=f'R{n}', console_type='telnet', console_host=t.host, console=t.port)
+                      for n, t in enumerate(self.consoles)]
+        self.configs = {node: ['configure terminal', f'hostname {node.metadata.name}', 'end'] for node in self.nodes}
+
+    def tearDown(self):
+        for t in self.consoles:
+            t.stop()
+
+    def test_push_configs(self):
+        result = ConsolePool().push_configs(self.configs)
+        self.assertGreater(self.concurrency.peak, 1)
+        self.assertEqual({}, result['errors'])
+        for node, console in zip(self.nodes, self.consoles):
+            self.assertEqual(self.configs[node], console.received)
+            self.assertIn(f'hostname {node.metadata.name}\r\n{node.metadata.name}#', result['results'][node])
+
+    def test_max_per_host(self):
+        result = ConsolePool(max_per_host=1).push_configs(self.configs)
+        self.assertEqual(1, self.concurrency.peak)
+        self.assertEqual(4, len(result['results']))
+
+    def test_expect_timeout(self):
+        async def wait(console, node):
+            await console.expect('never', timeout=0.2)
+
+        result = ConsolePool().run(self.nodes[:1], wait)
+        self.assertIsInstance(result['errors'][self.nodes[0]], asyncio.TimeoutError)
+
+    def test_from_node(self):
+        server = Server('http://gns3.example.com:3080/v2')
+        project = Project(server=server, project_id='0f1bc4a4-0c83-4d6a-8bd7-ea8b7a4d6e2c')
+        console = Console.from_node(Node(project=project, console_type='telnet', console_host='0.0.0.0', console=5000))
+        self.assertEqual(('gns3.example.com', 5000), (console.host, console.port))
+        with self.assertRaises(InvalidParameters):
+            Console.from_node(Node(project=project, console_type='vnc', console_host='0.0.0.0', console=5900))
+        server.close()
+
+
+class TestFleet(unittest.TestCase):
+    def setUp(self):
+        self.concurrency = ConcurrencyCounter()
+        self.fakes = [FakeGNS3Server(latency=0.1, concurrency=self.concurrency) for _ in range(4)]
+        self.fleet = Fleet()
+        for n, fake in enumerate(self.fakes):
+            server = Server(f'http://gns3-{n}.fake/v2')
+            server.mount(f'http://gns3-{n}.fake/', FakeAdapter(fake))
+            self.fleet.append(server)
+
+    def tearDown(self):
+        self.fleet.close()
+
+    def test_run(self):
+        result = self.fleet.run(lambda server: Project(name='test_project', server=server).create())
+        self.assertGreater(self.concurrency.peak, 1)
+        self.assertEqual((4, 0), (len(result['results']), len(result['errors'])))
+        self.assertTrue(all(len(fake.projects) == 1 for fake in self.fakes))
+
+    def test_run_errors(self):
+        Project(name='test_project', server=self.fleet[0]).create()
+        result = self.fleet.run(lambda server: Project(name='test_project', server=server).create())
+        self.assertEqual([self.fleet[0]], list(result['errors']))
+        self.assertIsInstance(result['errors'][self.fleet[0]], InvalidParameters)
+        self.assertEqual(3, len(result['results']))
+
+    def test_run_items(self):
+        self.fleet.per_server = 2
+        result = self.fleet.run(lambda server, name: Project(name=name, server=server).create(),
+                                ['test_project1', 'test_project2', 'test_project2'])
+        self.assertGreater(self.concurrency.peak, 2)
+        self.assertEqual(4, len(result['errors']))
+        self.assertTrue(all(item == 'test_project2' for errors in result['errors'].values() for item, _ in errors))
+        self.assertTrue(all(len(fake.projects) == 2 for fake in self.fakes))
+
+    def test_run_concurrent_writes(self):
+        names = [f'test_project{n}' for n in range(30)]
+        result = self.fleet.run(lambda server, name: Project(name=name, server=server).create(), names)
+        self.assertEqual({}, result['errors'])
+        self.assertTrue(all(len(fake.projects) == len(names) for fake in self.fakes))
+
+    def test_from_urls(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        http_servers = [FakeHTTPServer().start() for _ in range(2)]
+        fleet = Fleet.from_urls([t.url for t in http_servers], per_server=2, backend='sqlite',
+                                cache_name=os.path.join(directory.name, 'http_cache'))
+        try:
+            self.assertEqual(2, len(os.listdir(directory.name)))
+            result = fleet.run(lambda server, name: Project(name=name, server=server).create(),
+                               [f'test_project{n}' for n in range(10)])
+            self.assertEqual({}, result['errors'])
+        finally:
+            fleet.close()
+            for t in http_servers:
+                t.stop()
+
 
 class TestTemplate(unittest.TestCase):
     def setUp(self):
@@ -236,6 +683,20 @@ class TestProjects(unittest.TestCase):
         self.server.projects.pull()
         self.assertEqual(len(self.server.projects), 1)
 
+    def test_lazy_lists(self):
+        Project(name='test_project', server=self.server).create()
+        self.server.projects.pull()
+        project = next(t for t in self.server.projects if t.metadata.name == 'test_project')
+        self.assertEqual((None, None, None, None),
+                         (project._nodes, project._links, project._drawings, project._snapshots))
+        self.assertIs(project.nodes, project.nodes)
+        self.assertEqual(0, len(project.links))
+        topology = project.topology
+        self.assertIs(topology, project._topology)
+        self.assertIsNone(topology.node('unknown'))
+        project.links = LinkList(project=project)
+        self.assertIsNone(project._topology)
+
     def test_diff_add(self):
         self.server.projects.pull()
         self.server.projects.append(Project(name='test_project', server=self.server))
@@ -289,6 +750,168 @@ class TestProjects(unittest.TestCase):
         self.assertEqual(project.metadata.auto_close, False)
 
 
+class TestProjectLifecycle(unittest.TestCase):
+    FAKE_URL = 'http://gns3.fake/v2'
+
+    def setUp(self):
+        self.fake = FakeGNS3Server()
+        self.server = Server(self.FAKE_URL)
+        self.server.mount('http://gns3.fake/', FakeAdapter(self.fake))
+        template = Template(name='test_template', template_type='qemu', server=self.server)
+        template.create()
+        self.project = Project(name='test_project', server=self.server)
+        self.project.create()
+        self.project.nodes.instantiate(template, count=2)
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_open_close(self):
+        self.project.close()
+        self.assertEqual('closed', self.project.metadata.status)
+        self.assertEqual({'test_project': 'closed'}, self.server.projects.statuses())
+        self.project.open()
+        self.assertEqual('opened', self.project.metadata.status)
+        with self.server.expect_requests(max=1):
+            self.assertEqual({'test_project': 'opened'}, self.server.projects.statuses())
+
+    def test_duplicate(self):
+        project = self.project.duplicate('test_project_copy')
+        self.assertNotEqual(self.project.id, project.id)
+        project.nodes.pull()
+        self.assertEqual(2, len(project.nodes))
+        with self.server.expect_requests(max=2):
+            projects = self.server.projects.duplicate_many(self.project, ['test_pool1', 'test_pool2'])
+        self.assertEqual(['test_pool1', 'test_pool2'], [t.metadata.name for t in projects])
+        self.assertEqual(4, len(self.server.projects.statuses()))
+
+    def test_close_idle(self):
+        busy = self.project.duplicate('test_busy')
+        busy.nodes.pull()
+        busy.nodes[0].start()
+        self.project.duplicate('test_excluded')
+        with self.server.expect_requests(max=5):
+            closed = self.server.projects.close_idle(exclude=['test_excluded'])
+        self.assertEqual(['test_project'], [t.metadata.name for t in closed])
+        self.assertEqual({'test_project': 'closed', 'test_busy': 'opened', 'test_excluded': 'opened'},
+                         self.server.projects.statuses())
+
+
+class TestProjectSnapshot(unittest.TestCase):
+    SVG = '<svg height="100" width="100" name="test_drawing"><rect fill="#ebecff" height="100" width="100" /></svg>'
+    server: Server
+    template: Template
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = Server(GNS3_SERVER_URL)
+        for name in 'test_project', 'test_project_copy':
+            project = Project(name=name, server=cls.server)
+            if project.exists:
+                project.delete()
+
+        template = Template(name='test_template', template_type="qemu", server=cls.server)
+        while template.exists:
+            template.delete()
+            template = Template(name='test_template', template_type="qemu", server=cls.server)
+        cls.template = Template(name='test_template', template_type="qemu", server=cls.server)
+        cls.template.create()
+
+    @classmethod
+    def tearDownClass(cls):
+        project = Project(name='test_project', server=cls.server)
+        if project.exists:
+            project.delete()
+        cls.server.close()
+
+    def setUp(self):
+        self.project = Project(name='test_project', server=self.server)
+        if not self.project.exists:
+            self.project.create()
+        self.project.read()
+
+        node1 = Node(name='test_node1', template=self.template, project=self.project, x=100)
+        node1.create()
+        node2 = Node(name='test_node2', template=self.template, project=self.project)
+        node2.create()
+        Link(project=self.project, nodes=[
+            {'adapter_number': 0, 'node': node1, 'port_number': 0},
+            {'adapter_number': 0, 'node': node2, 'port_number': 0}
+        ]).create()
+        Drawing(project=self.project, svg=self.SVG, x=10, y=20).create()
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'test_project.jsonl.gz')
+        self.project.snapshot(self.path)
+
+    def tearDown(self):
+        for name in 'test_project', 'test_project_copy':
+            project = Project(name=name, server=self.server)
+            if project.exists:
+                project.delete()
+
+    def test_read_snapshot(self):
+        with self.server.expect_requests(max=0):
+            nodes, drawings, links = self.project.read_snapshot(self.path)
+        self.assertEqual((2, 1, 1), (len(nodes), len(drawings), len(links)))
+        self.assertEqual({nodes[0], nodes[1]}, {end['node'] for end in links[0].metadata.nodes})
+
+    def test_diff_snapshot(self):
+        self.project.nodes.pull()
+        self.project.links.pull()
+        self.project.drawings = DrawingList(project=self.project)
+        node = next(t for t in self.project.nodes if t.metadata.name == 'test_node1')
+        node.metadata.x = 200
+        with self.server.expect_requests(max=0):
+            diff = self.project.diff_snapshot(self.path)
+        self.assertEqual([node], diff['nodes']['update'])
+        self.assertEqual((0, 0, 0), (len(diff['links']['create']), len(diff['links']['update']),
+                                     len(diff['links']['delete'])))
+        self.assertEqual(1, len(diff['drawings']['delete']))
+
+    def test_apply(self):
+        self.project.links.pull()
+        self.project.links[0].delete()
+        self.project.nodes.pull()
+        node = next(t for t in self.project.nodes if t.metadata.name == 'test_node1')
+        node.metadata.x = 200
+        node.update()
+        diff = self.project.apply(self.path)
+        self.assertEqual((1, 1), (len(diff['nodes']['update']), len(diff['links']['create'])))
+        self.project.nodes.pull()
+        node = next(t for t in self.project.nodes if t.metadata.name == 'test_node1')
+        self.assertEqual(node.metadata.x, 100)
+
+    def test_apply_to_new_project(self):
+        project = Project(name='test_project_copy', server=self.server)
+        project.create()
+        project.apply(self.path)
+        project.nodes.pull()
+        project.links.pull()
+        project.drawings.pull()
+        self.assertEqual((2, 1, 1), (len(project.nodes), len(project.links), len(project.drawings)))
+
+    def test_export_import(self):
+        path = os.path.join(os.path.dirname(self.path), 'test_project.gns3project')
+        progress = list()
+        nb_cached_responses = len(self.server.cache.responses)
+        size = self.project.export_to(path, chunk_size=64, progress=lambda done, total: progress.append(done))
+        self.assertEqual(size, os.path.getsize(path))
+        self.assertEqual(size, progress[-1])
+        self.assertEqual(nb_cached_responses, len(self.server.cache.responses))
+
+        progress = list()
+        with open(path, 'rb') as f:
+            project = self.server.projects.import_from(f, name='test_project_copy', chunk_size=64,
+                                                       progress=lambda done, total: progress.append((done, total)))
+        self.assertEqual((size, size), progress[-1])
+        self.assertIn(project, self.server.projects)
+        project.nodes.pull()
+        project.links.pull()
+        self.assertEqual((2, 1), (len(project.nodes), len(project.links)))
+
+
 class TestDrawing(unittest.TestCase):
     SVG_WITH_NAME = '<svg height="{0}" width="{1}" name="test_drawing">' \
                     '<rect fill="#ebecff" fill-opacity="1.0" height="{0}" width="{1}" />' \
@@ -335,6 +958,12 @@ class TestDrawing(unittest.TestCase):
         svg = m.dict()['svg']
         self.assertEqual(self.SVG_WITH_NAME, svg)
 
+    def test_dict_keeps_svg_unchanged(self):
+        drawing = Drawing(name='test_drawing', project=self.project, svg=self.SVG_WITHOUT_NAME)
+        m: DrawingMetadata = drawing.metadata
+        self.assertEqual(m.dict()['svg'], m.dict()['svg'])
+        self.assertEqual(self.SVG_WITHOUT_NAME, m.svg)
+
     def test_get_id(self):
         drawing = Drawing(name='test_drawing', project=self.project, svg=self.SVG_WITHOUT_NAME)
         drawing.create()
@@ -475,6 +1104,14 @@ class TestDrawings(unittest.TestCase):
         drawing = next(t for t in self.project.drawings if t.metadata.name == 'test_drawing')
         self.assertEqual(drawing.metadata.svg, self.SVG_WITHOUT_NAME.replace('100', '200'))
 
+    def test_move_many(self):
+        drawing = Drawing(name='test_drawing', project=self.project, svg=self.SVG_WITHOUT_NAME)
+        drawing.create()
+        self.project.drawings.move_many({drawing: (100, 200, 3)})
+        self.project.drawings.pull()
+        drawing = next(t for t in self.project.drawings if t.metadata.name == 'test_drawing')
+        self.assertEqual((100, 200, 3), (drawing.metadata.x, drawing.metadata.y, drawing.metadata.z))
+
 
 class TestNode(unittest.TestCase):
     server: Server
@@ -523,6 +1160,13 @@ class TestNode(unittest.TestCase):
         node.create()
         self.assertIsNotNone(node.metadata.node_id)
 
+    def test_create_with_attributes(self):
+        node = Node(name='test_node', template=self.template, project=self.project, x=100, y=50, locked=True)
+        node.create()
+        node = Node(name='test_node', template=self.template, project=self.project)
+        node.read()
+        self.assertEqual((100, 50, True), (node.metadata.x, node.metadata.y, node.metadata.locked))
+
     def test_read(self):
         node = Node(name='test_node', template=self.template, project=self.project)
         node.create()
@@ -542,6 +1186,15 @@ class TestNode(unittest.TestCase):
         node.read()
         self.assertEqual(node.metadata.x, 200)
 
+    def test_update_in_place(self):
+        node = Node(name='test_node', template=self.template, project=self.project)
+        node.create()
+        node.metadata.properties['ram'] = 512
+        node.update()
+        node = Node(name='test_node', template=self.template, project=self.project)
+        node.read()
+        self.assertEqual(512, node.metadata.properties['ram'])
+
     def test_delete(self):
         node = Node(name='test_node', template=self.template, project=self.project)
         node.create()
@@ -678,6 +1331,68 @@ class TestNodes(unittest.TestCase):
         node = next(t for t in self.project.nodes if t.metadata.name == 'test_node')
         self.assertEqual(node.metadata.x, 200)
 
+    def test_diff_resolves_ids_once(self):
+        for n in range(3):
+            Node(name=f'test_node{n}', template=self.template, project=self.project).create()
+        nodes = [Node(name=f'test_node{n}', project=self.project) for n in range(3)]
+        self.project.nodes = NodeList(project=self.project, initlist=nodes)
+        with self.server.expect_requests(max=1):
+            diff = self.project.nodes.diff()
+        self.assertEqual((0, 0, 0), (len(diff['create']), len(diff['update']), len(diff['delete'])))
+        self.assertTrue(all(t.metadata.node_id for t in nodes))
+
+    def test_request_budget(self):
+        Node(name='test_node', template=self.template, project=self.project).create()
+        with self.server.expect_requests(max=1):
+            self.project.nodes.pull()
+        self.server.cache.clear()
+        with self.server.expect_requests(max=1):
+            self.project.nodes.diff()
+        self.server.cache.clear()
+        with self.server.expect_requests(max=1):
+            self.assertTrue(self.project.nodes[0].exists)
+
+    def test_iter_remote(self):
+        nodes = self.project.nodes.instantiate(self.template, count=3)
+        nodes[0].start()
+        self.project.nodes.data = []
+        with self.server.expect_requests(max=1):
+            stopped = list(self.project.nodes.iter_remote(filter={'status': 'stopped', 'node_type': 'qemu'}))
+        self.assertEqual(sorted(t.metadata.name for t in nodes[1:]), sorted(t.metadata.name for t in stopped))
+        self.assertEqual([], self.project.nodes.data)
+        started = self.project.nodes.iter_remote(filter=lambda t: t['status'] == 'started')
+        self.assertEqual(nodes[0].metadata.node_id, next(started).metadata.node_id)
+        self.assertEqual([], list(started))
+        self.assertEqual(['test_project'], [t.metadata.name for t in self.server.projects.iter_remote(
+            filter={'name': 'test_project'})])
+
+    def test_move_many(self):
+        Node(name='test_node1', template=self.template, project=self.project).create()
+        Node(name='test_node2', template=self.template, project=self.project).create()
+        self.project.nodes.pull()
+        node1, node2 = sorted(self.project.nodes, key=lambda t: t.metadata.name)
+        self.project.nodes.move_many([(node1, (100, 50)), (node2, (0, 0)), (node2, (200, 150))])
+        self.project.nodes.pull()
+        positions = {t.metadata.name: (t.metadata.x, t.metadata.y) for t in self.project.nodes}
+        self.assertEqual({'test_node1': (100, 50), 'test_node2': (200, 150)}, positions)
+
+    def test_instantiate(self):
+        Node(name='test_template-2', template=self.template, project=self.project).create()
+        self.project.nodes.pull()
+        with self.server.expect_requests(max=6):
+            nodes = self.project.nodes.instantiate(self.template, count=4, spacing=50)
+        self.assertEqual(['test_template-1', 'test_template-3', 'test_template-4', 'test_template-5'],
+                         [t.metadata.name for t in nodes])
+        self.assertEqual([(0, 0), (50, 0), (0, 50), (50, 50)], [(t.metadata.x, t.metadata.y) for t in nodes])
+        self.assertEqual(5, len(self.project.nodes))
+        self.assertEqual(5, len(self.project.nodes._get()))
+
+        nodes = self.project.nodes.instantiate(self.template, count=3, layout='circle', name_format='R{0}')
+        self.assertEqual(['R1', 'R2', 'R3'], [t.metadata.name for t in nodes])
+        self.assertEqual(3, len(set((t.metadata.x, t.metadata.y) for t in nodes)))
+        with self.assertRaises(InvalidParameters):
+            self.project.nodes.instantiate(self.template, count=1, layout='star')
+
 
 class TestLinkEquality(unittest.TestCase):
     def test_are_link_ends_the_same_ok_object(self):
@@ -789,6 +1504,113 @@ class TestLinkEquality(unittest.TestCase):
         self.assertFalse(Link.are_link_ends_the_same([nodes[1], nodes[0]], nodes2))
 
 
+class TestMetadataDirtyTracking(unittest.TestCase):
+    REMOTE_NODE = {'name': 'test_node', 'node_id': '1', 'compute_id': 'local', 'x': 0, 'y': 0,
+                   'properties': {'ram': 256}}
+
+    def test_new_metadata_is_dirty(self):
+        metadata = NodeMetadata(name='test_node')
+        self.assertIn('name', metadata.dirty)
+
+    def test_mark_synced(self):
+        metadata = NodeMetadata(**self.REMOTE_NODE).mark_synced()
+        self.assertEqual(set(), metadata.dirty)
+        self.assertEqual({}, metadata.diff(metadata.dict(include_ro=True)))
+
+    def test_assignment_is_dirty(self):
+        metadata = NodeMetadata(**self.REMOTE_NODE).mark_synced()
+        remote_object = metadata.dict(include_ro=True)
+        metadata.x = 100
+        self.assertEqual({'x'}, metadata.dirty)
+        self.assertEqual({'x': 100}, metadata.diff(remote_object))
+
+    def test_nested_change_is_noticed(self):
+        metadata = NodeMetadata(**self.REMOTE_NODE).mark_synced()
+        metadata.properties['ram'] = 512
+        self.assertEqual({'properties': {'ram': 512}}, metadata.diff(dict(self.REMOTE_NODE, properties={'ram': 256})))
+
+    def test_remote_change_is_noticed(self):
+        metadata = NodeMetadata(**self.REMOTE_NODE).mark_synced()
+        self.assertEqual({'x': 0}, metadata.diff(dict(self.REMOTE_NODE, x=100)))
+
+    def test_diff_is_read_only(self):
+        metadata = NodeMetadata(**self.REMOTE_NODE).mark_synced()
+        self.assertEqual({'x': 0}, metadata.diff(dict(self.REMOTE_NODE, x=100)))
+        self.assertEqual(set(), metadata.dirty)
+        self.assertEqual({}, metadata.diff(self.REMOTE_NODE))
+
+    def test_unchanged_diff_is_fast(self):
+        metadatas = [
+            NodeMetadata(**dict(self.REMOTE_NODE, node_id=str(n), properties={'ram': 256, 'usage': 'x' * 2000}))
+            .mark_synced()
+            for n in range(1000)
+        ]
+        # remote objects equal to the synced state, but not sharing any of its values
+        pairs = [(t, json.loads(json.dumps(t.dict(include_ro=True)))) for t in metadatas]
+        diff = min(timeit.repeat(lambda: [t.diff(s) for t, s in pairs], number=1, repeat=5))
+        diff_dict = min(timeit.repeat(
+            lambda: [BaseObjectMetadata._diff_dict(t.dict(include_ro=True), s) for t, s in pairs], number=1, repeat=5))
+        self.assertTrue(all(t.diff(s) == {} for t, s in pairs))
+        self.assertLessEqual(diff, diff_dict)
+
+    def test_mark_synced_with_remote_object(self):
+        metadata = NodeMetadata(**self.REMOTE_NODE).mark_synced()
+        remote_object = dict(self.REMOTE_NODE, x=100)
+        metadata.mark_synced(remote_object)
+        self.assertEqual({'x'}, metadata.dirty)
+        self.assertEqual({'x': 0}, metadata.diff(remote_object))
+
+    def test_changes(self):
+        metadata = NodeMetadata(**self.REMOTE_NODE)
+        self.assertEqual(metadata.dict(), metadata.changes())
+        metadata.mark_synced()
+        metadata.x = 100
+        metadata.y = 0
+        self.assertEqual({'x': 100}, metadata.changes())
+
+    def test_changes_in_place(self):
+        metadata = NodeMetadata(**self.REMOTE_NODE).mark_synced()
+        metadata.properties['ram'] = 512
+        self.assertEqual({'properties': {'ram': 512}}, metadata.changes())
+        metadata.mark_synced()
+        self.assertEqual({}, metadata.changes())
+
+    def test_changes_drawing_name(self):
+        metadata = DrawingMetadata(drawing_id='1', svg='<svg height="100" width="100" />').mark_synced()
+        metadata.name = 'test_drawing'
+        self.assertEqual({'svg': '<svg height="100" width="100" name="test_drawing" />'}, metadata.changes())
+
+    def test_large_svg_is_not_memoized(self):
+        image = 'x' * 100000
+        svg = f'<svg height="100" width="100"><image href="data:image/png;base64,{image}" /></svg>'
+        metadata = DrawingMetadata(drawing_id='1', svg=svg).mark_synced()
+        metadata.name = 'test_drawing'
+        currsize = _split_svg_name.cache_info().currsize, _join_svg_name.cache_info().currsize
+        self.assertIn('name="test_drawing"', metadata.dict()['svg'])
+        self.assertEqual('test_drawing', DrawingMetadata(svg='').update({'svg': metadata.dict()['svg']}).name)
+        self.assertEqual(currsize, (_split_svg_name.cache_info().currsize, _join_svg_name.cache_info().currsize))
+
+
+class TestIterJsonArray(unittest.TestCase):
+    @staticmethod
+    def split(text: str, offset: int) -> list:
+        data = text.encode()
+        return [data[:offset], data[offset:]]
+
+    def test_split_at_every_offset(self):
+        text = ' [1.5, 2e3 , -0.25E-2,12,true, null, "a,] \u00e9", {"x": [1, 2]}, [] ] '
+        for offset in range(len(text.encode()) + 1):
+            with self.subTest(offset=offset):
+                self.assertEqual(json.loads(text), list(_iter_json_array(self.split(text, offset))))
+        self.assertEqual([], list(_iter_json_array(self.split('[]', 1))))
+
+    def test_invalid(self):
+        for text in ('[1 2]', '[1,,2]', '[,1]', '[1,]', '[1.x]', '{"a": 1}', '[1, 2', ''):
+            for offset in range(len(text.encode()) + 1):
+                with self.subTest(text=text, offset=offset), self.assertRaises(ValueError):
+                    list(_iter_json_array(self.split(text, offset)))
+
+
 class TestLink(unittest.TestCase):
     server: Server
     template: Template
@@ -987,6 +1809,144 @@ class TestLinks(unittest.TestCase):
         link = self.project.links[0]
         self.assertEqual(link.metadata.suspend, False)
 
+    def test_load(self):
+        Link(project=self.project, nodes=self.NODES).create()
+        Drawing(project=self.project, svg='<svg height="10" width="10"></svg>').create()
+        project = Project(name='test_project', server=self.server)
+        with self.server.expect_requests(max=4):
+            project.load()
+        self.assertEqual((2, 1, 1), (len(project.nodes), len(project.links), len(project.drawings)))
+        self.assertTrue(all(any(end['node'] is t for t in project.nodes) for end in project.links[0].metadata.nodes))
+
+    def test_topology(self):
+        self.project.load()
+        topology = self.project.topology
+        node3 = Node(name='test_node3', template=self.template, project=self.project, properties={'adapters': 2})
+        node3.create()
+        link = Link(project=self.project, nodes=[
+            {'adapter_number': 0, 'node': self.node1, 'port_number': 0},
+            {'adapter_number': 1, 'node': node3, 'port_number': 0}
+        ])
+        link.create()
+        self.assertIs(self.project.topology, topology)
+        self.assertIs(topology.peer(self.node1, 0, 0)['node'], node3)
+        self.assertIs(topology.link_at(node3, 1, 0), link)
+        self.assertEqual([0], [p['adapter_number'] for p in topology.free_ports(node3)])
+        self.assertEqual([self.node1.id, node3.id], [t.metadata.node_id for t in topology.path(self.node1, node3)])
+        self.assertIsNone(topology.path(self.node2, node3))
+
+        link.delete()
+        self.assertIsNone(topology.peer(self.node1, 0, 0))
+        self.assertEqual(2, len(topology.free_ports(node3)))
+        node3.delete()
+        self.assertEqual([], topology.neighbors(self.node1))
+        self.project.links.pull()
+        self.assertIsNot(self.project.topology, topology)
+
+    def test_connect_many(self):
+        node3 = Node(name='test_node3', template=self.template, project=self.project, properties={'adapters': 2})
+        node3.create()
+        self.project.links.pull()
+        links = [
+            (self.node1, (0, 0), node3, 'e0'),
+            ('test_node2', 'Ethernet0', node3, (1, 0)),
+            (self.node2, (0, 0), node3, (1, 0)),
+            (self.node1, (1, 0), 'test_node2', (0, 0)),
+            ('test_node4', (0, 0), node3, (1, 0))
+        ]
+        with self.server.expect_requests(max=3):
+            result = self.project.links.connect_many(links)
+        self.assertEqual(2, len(result['created']))
+        self.assertEqual(links[2:], [spec for spec, _ in result['failed']])
+        self.assertEqual(2, len(self.project.links))
+        self.project.links.pull()
+        self.assertEqual(2, len(self.project.links))
+
+    def test_capture(self):
+        link = Link(project=self.project, nodes=self.NODES)
+        link.create()
+        link.start_capture(capture_file_name='test.pcap')
+        self.assertTrue(link.metadata.capturing)
+        self.assertEqual('test.pcap', link.metadata.capture_file_name)
+        f = io.BytesIO()
+        progress = list()
+        with self.server.expect_requests(max=2) as counter:
+            size = link.capture_to(f, chunk_size=4096, progress=progress.append)
+            self.assertEqual(size, sum(len(chunk) for chunk in link.capture_stream()))
+        self.assertEqual(2, counter.calls[('GET', '/projects/{id}/links/{id}/pcap')])
+        self.assertEqual(b'\xd4\xc3\xb2\xa1', f.getvalue()[:4])
+        self.assertEqual(size, len(f.getvalue()))
+        self.assertEqual(size, progress[-1])
+        self.assertGreater(len(progress), 1)
+        link.stop_capture()
+        self.assertFalse(link.metadata.capturing)
+
+    def test_start_captures(self):
+        node3 = Node(name='test_node3', template=self.template, project=self.project, properties={'adapters': 2})
+        node3.create()
+        self.project.links.connect_many([(self.node1, 'e0', node3, 'e0'), (self.node2, 'e0', node3, 'e1')])
+        with self.server.expect_requests(max=2):
+            self.project.links.start_captures()
+        self.project.links.pull()
+        self.assertTrue(all(t.metadata.capturing for t in self.project.links))
+        with self.server.expect_requests(max=2):
+            self.project.links.stop_captures()
+        self.assertFalse(any(t.metadata.capturing for t in self.project.links))
+
+    def test_apply_filters(self):
+        node3 = Node(name='test_node3', template=self.template, project=self.project, properties={'adapters': 2})
+        node3.create()
+        self.project.links.connect_many([(self.node1, 'e0', node3, 'e0'), (self.node2, 'e0', node3, 'e1')])
+        link1, link2 = self.project.links
+        link1.set_filters(LinkFilters(packet_loss=5))
+        with self.server.expect_requests(max=2):
+            previous = self.project.links.apply_filters(None, LinkFilters(delay=100, jitter=10))
+        self.assertEqual({link1: {'packet_loss': [5]}, link2: {}}, previous)
+        self.project.links.pull()
+        filters = {t.metadata.link_id: t.filters for t in self.project.links}
+        self.assertEqual(LinkFilters(delay=100, jitter=10, packet_loss=5), filters[link1.metadata.link_id])
+        self.assertEqual({'delay': [100, 10]}, filters[link2.metadata.link_id].dict())
+
+        with self.server.expect_requests(max=0):
+            self.assertEqual({}, self.project.links.apply_filters(None, {'delay': [100, 10]}))
+        with self.server.expect_requests(max=1):
+            self.project.links.apply_filters(lambda t: t.metadata.link_id == link2.metadata.link_id, {}, merge=False)
+        with self.server.expect_requests(max=2):
+            self.project.links.revert_filters(previous)
+        self.project.links.pull()
+        self.assertCountEqual([LinkFilters(packet_loss=5), LinkFilters()], [t.filters for t in self.project.links])
+
+    def test_iter_remote(self):
+        Link(project=self.project, nodes=self.NODES).create()
+        self.project.nodes.pull()
+        with self.server.expect_requests(max=1):
+            links = list(self.project.links.iter_remote(nodes=self.project.nodes))
+        self.assertEqual(1, len(links))
+        self.assertEqual({id(t) for t in self.project.nodes}, {id(n['node']) for n in links[0].metadata.nodes})
+        self.assertEqual([], list(self.project.links.iter_remote(filter={'suspend': True})))
+
+    def test_diff_by_node_names(self):
+        Link(project=self.project, nodes=self.NODES).create()
+        nodes = [
+            {'adapter_number': 0, 'node': Node(name='test_node2', project=self.project), 'port_number': 0},
+            {'adapter_number': 0, 'node': Node(name='test_node1', project=self.project), 'port_number': 0}
+        ]
+        self.project.links = LinkList(project=self.project, initlist=[Link(project=self.project, nodes=nodes)])
+        diff = self.project.links.diff()
+        self.assertEqual((0, 0, 0), (len(diff['create']), len(diff['update']), len(diff['delete'])))
+
+    def test_request_budget(self):
+        Link(project=self.project, nodes=self.NODES).create()
+        with self.server.expect_requests(max=2):
+            self.project.links.pull()
+        self.server.cache.clear()
+        with self.server.expect_requests(max=2):
+            self.project.links.diff()
+        link = self.project.links[0]
+        link.metadata.suspend = True
+        with self.server.expect_requests(max=1):
+            link.update()
+
 
 if __name__ == '__main__':
     unittest.main()